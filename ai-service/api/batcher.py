@@ -0,0 +1,184 @@
+"""
+Prompt Micro-Batcher
+
+Coalesces concurrent completion requests for the local llama-cpp server
+into a single /v1/completions call with a list prompt, so prefill work is
+shared across requests that arrive within a few milliseconds of each other.
+
+llama-cpp-python's OpenAI-compatible server only accepts a list of at most
+one prompt, so batching is opt-in (multi_prompt); without it submit()
+posts each prompt straight away, with no queueing delay.
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+import aiohttp
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class ModelSlots:
+    """
+    Bounds concurrent model calls and counts how many are in flight.
+
+    Used as ``async with slots:``; in_flight lets callers such as /health
+    report free slots without reading asyncio.Semaphore internals.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @property
+    def available(self) -> int:
+        return self.limit - self.in_flight
+
+    async def __aenter__(self) -> "ModelSlots":
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class PromptBatcher:
+    """
+    Collects prompts from concurrent callers and sends them in batches.
+
+    Callers await submit(); with multi_prompt set, a background worker
+    drains the queue, waiting at most max_wait seconds for up to max_batch
+    prompts, then posts them in one request per distinct max_tokens value
+    and resolves each caller's future with its completion text (or None if
+    the server returned an error status). Without multi_prompt, submit()
+    posts the prompt on its own.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: ModelSlots,
+        url: str,
+        body: Dict[str, Any],
+        max_batch: int = 8,
+        max_wait: float = 0.01,
+        multi_prompt: bool = False,
+    ):
+        self.session = session
+        self.semaphore = semaphore
+        self.url = url
+        self.body = body
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.multi_prompt = multi_prompt
+
+        self._queue: "asyncio.Queue[Tuple[str, int, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Start the background worker (requires a running event loop)."""
+        if self.multi_prompt and self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the worker, fail queued prompts and wait for in-flight batches."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("PromptBatcher closed"))
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def submit(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Send a prompt (queued for batching if multi_prompt) and wait for its completion text."""
+        future = asyncio.get_running_loop().create_future()
+        if not self.multi_prompt:
+            await self._post([(prompt, future)], max_tokens)
+        else:
+            await self._queue.put((prompt, max_tokens, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            try:
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Closing; don't leave the prompts collected so far waiting
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("PromptBatcher closed"))
+                raise
+
+            # max_tokens is per request body, so split by it
+            groups: Dict[int, List[Tuple[str, asyncio.Future]]] = {}
+            for prompt, max_tokens, future in batch:
+                groups.setdefault(max_tokens, []).append((prompt, future))
+
+            # Dispatch without blocking collection of the next batch; the
+            # semaphore bounds how many batches hit the server at once
+            for max_tokens, group in groups.items():
+                task = asyncio.create_task(self._post(group, max_tokens))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _post(self, batch: List[Tuple[str, asyncio.Future]], max_tokens: int):
+        prompts = [prompt for prompt, _ in batch]
+        futures = [future for _, future in batch]
+
+        try:
+            async with self.semaphore:
+                async with self.session.post(
+                    self.url,
+                    data=orjson.dumps({
+                        **self.body,
+                        "prompt": prompts if len(prompts) > 1 else prompts[0],
+                        "max_tokens": max_tokens,
+                    }),
+                    headers=_JSON_HEADERS,
+                ) as response:
+                    if response.status != 200:
+                        logger.error("Model API error: %s", response.status)
+                        texts: List[Optional[str]] = [None] * len(batch)
+                    else:
+                        result = orjson.loads(await response.read())
+                        texts = [None] * len(batch)
+                        for i, choice in enumerate(result["choices"]):
+                            texts[choice.get("index", i)] = choice["text"].strip()
+
+            for future, text in zip(futures, texts):
+                if not future.done():
+                    future.set_result(text)
+
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,50 @@
+"""
+LLM Response Cache
+
+Exact-match cache for ophthalmic knowledge answers, keyed on a SHA-256 of
+(question, context).
+
+There's no paraphrase (embedding similarity) tier: sentence-transformers
+is deliberately left out of requirements.txt to keep the image small.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    In-process answer cache with exact lookup.
+
+    Holds at most max_entries answers; when full, the least recently
+    inserted entry is dropped.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+
+        # key -> answer
+        self._answers: "OrderedDict[str, str]" = OrderedDict()
+
+    @staticmethod
+    def make_key(question: str, context: Optional[str] = None) -> str:
+        """Exact-match key for a (question, context) pair."""
+        h = hashlib.sha256(question.encode())
+        if context is not None:
+            h.update(b"\x00")
+            h.update(context.encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Exact-match lookup."""
+        return self._answers.get(key)
+
+    def put(self, key: str, answer: str):
+        """Insert an answer."""
+        self._answers[key] = answer
+        if len(self._answers) > self.max_entries:
+            self._answers.popitem(last=False)
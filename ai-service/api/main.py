@@ -16,38 +16,175 @@ Security Features:
 from fastapi import FastAPI, Depends, HTTPException, status, Security, Request, UploadFile, File, Form
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Literal
 import jwt
 from datetime import datetime, timedelta
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import os
-import base64
+import queue
+import asyncio
+import atexit
+import re
+import hashlib
+import threading
+import time
+from collections import defaultdict
 from functools import lru_cache
+from contextlib import asynccontextmanager
+
+import aiohttp
+import orjson
+from cachetools import TTLCache
+from cachetools.func import ttl_cache
 
 # Import RAG engine
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from rag.secure_rag_engine import SecureRAGEngine, TenantDatabaseConfig
 
+# query_type -> SecureRAGEngine method
+_QUERY_DISPATCH = {
+    "sales": SecureRAGEngine.query_sales,
+    "inventory": SecureRAGEngine.query_inventory,
+    "patient_analytics": SecureRAGEngine.query_patient_analytics,
+}
+
 # Import OCR service
-from .ocr import ocr_service, OCRRequest, OCRResponse, BatchOCRRequest
+from .ocr import ocr_service, OCRRequest, OCRResponse, BatchOCRRequest, UploadOCRRequest, MAX_IMAGE_BYTES
+
+# Import tenant router (its per-tenant RAG engines are closed on shutdown)
+from .tenant_router import tenant_router
 
 # Import ML models service
-from .ml_models import ml_models_service, ModelTestRequest, ModelTestResponse, BatchModelTestRequest, ModelHealthResponse
+from .ml_models import (
+    ml_models_service,
+    ModelTestRequest,
+    ModelTestResponse,
+    BatchModelTestRequest,
+    ModelHealthResponse,
+)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Import ophthalmic knowledge answer cache
+from .cache import LLMCache
+
+# Import llama-cpp request batcher
+from .batcher import ModelSlots, PromptBatcher
+
+# Configure logging. Handlers only enqueue records; a background listener
+# thread does the actual stderr writes so request handlers never block on
+# I/O. It runs from import until exit, so records logged outside the app's
+# lifespan (scripts, tests) are written too.
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
+_log_listener.start()
+# Flushes queued records on exit
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Security
 security = HTTPBearer()
 
+# ============================================================================
+# Lifespan
+# ============================================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Own every process-lifetime resource in one place.
+    
+    Everything here lives on app.state for the life of the worker process;
+    request handlers only ever read it.
+    """
+    settings = get_settings()
+    
+    # Startup
+    logger.info("AI Service starting up...")
+    logger.info("Model path: %s", settings.MODEL_PATH)
+    
+    # Tenant database configs, parsed from the environment once
+    app.state.tenant_configs = _load_tenant_configs()
+    logger.info("Loaded database configs for %d tenant(s)", len(app.state.tenant_configs))
+    
+    # Long-lived RAG engines, one per tenant, built on first use. Engines
+    # aren't thread-safe, so rag_query_locks lets only one worker thread
+    # query a given tenant's engine at a time.
+    app.state.rag_engines = {}
+    app.state.rag_locks = defaultdict(asyncio.Lock)
+    app.state.rag_query_locks = defaultdict(asyncio.Lock)
+    
+    # Tenant router's background usage writer and cache expiry sweeper
+    tenant_router.start()
+    
+    # One pooled session for all model calls so connections are kept alive
+    app.state.http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=256,
+            limit_per_host=64,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True,
+        ),
+        timeout=aiohttp.ClientTimeout(total=60, connect=5),
+    )
+    
+    # Bounds in-flight model calls
+    app.state.model_sem = ModelSlots(settings.MODEL_CONCURRENCY)
+    
+    # Posts completions to llama-cpp, coalescing concurrent ones into
+    # batched calls when MODEL_MULTI_PROMPT is set
+    app.state.prompt_batcher = PromptBatcher(
+        session=app.state.http_session,
+        semaphore=app.state.model_sem,
+        url=MODEL_COMPLETIONS_URL,
+        body=_BASE_BODY,
+        max_batch=settings.MODEL_BATCH_SIZE,
+        max_wait=settings.MODEL_BATCH_WAIT_MS / 1000,
+        multi_prompt=settings.MODEL_MULTI_PROMPT,
+    )
+    app.state.prompt_batcher.start()
+    
+    # Warm llama-cpp so the first real request doesn't pay model load
+    try:
+        async with app.state.http_session.post(
+            MODEL_COMPLETIONS_URL,
+            json={"prompt": "warmup", "max_tokens": 1},
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as response:
+            await response.read()
+    except Exception as e:
+        logger.warning("Model warmup skipped: %s", e)
+    
+    # Exact-match answer cache for knowledge queries
+    app.state.llm_cache = LLMCache()
+    
+    yield
+    
+    # Shutdown
+    logger.info("AI Service shutting down...")
+    
+    await app.state.prompt_batcher.close()
+    await app.state.http_session.close()
+    await ocr_service.aclose()
+    
+    for rag_engine in app.state.rag_engines.values():
+        rag_engine.close()
+    app.state.rag_engines.clear()
+    await tenant_router.close()
+
+
 # Initialize FastAPI
 app = FastAPI(
     title="Integrated Lens System AI Service",
     description="Secure multi-tenant AI for ophthalmic business intelligence",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS configuration for Railway deployment
@@ -77,6 +214,51 @@ app.add_middleware(
 )
 
 
+# Multipart overhead allowed on top of the image itself
+_UPLOAD_FORM_SLACK = 64 * 1024
+
+# Most images accepted in one batch upload (matches BatchOCRRequest)
+_MAX_BATCH_UPLOAD_FILES = 10
+
+# Upload path -> largest acceptable request body
+_UPLOAD_BODY_LIMITS = {
+    "/api/v1/ocr/upload": MAX_IMAGE_BYTES + _UPLOAD_FORM_SLACK,
+    "/api/v1/ocr/upload/batch": _MAX_BATCH_UPLOAD_FILES * (MAX_IMAGE_BYTES + _UPLOAD_FORM_SLACK),
+}
+
+
+@app.middleware("http")
+async def validate_upload_headers(request: Request, call_next):
+    """
+    Reject bad OCR uploads from their headers alone.
+    
+    FastAPI parses File/Form parameters before running dependencies, so
+    this has to happen in middleware to avoid buffering the body first.
+    """
+    body_limit = _UPLOAD_BODY_LIMITS.get(request.url.path)
+    if request.method == "POST" and body_limit is not None:
+        if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+            return ORJSONResponse(
+                {"detail": "Expected multipart/form-data"},
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+        
+        try:
+            content_length = int(request.headers.get("content-length") or 0)
+        except ValueError:
+            return ORJSONResponse(
+                {"detail": "Invalid Content-Length header"},
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        if content_length > body_limit:
+            return ORJSONResponse(
+                {"detail": "File exceeds 10MB limit"},
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+    
+    return await call_next(request)
+
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -87,6 +269,14 @@ class Settings:
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_MINUTES: int = 60
     MODEL_PATH: str = os.getenv("MODEL_PATH", "~/.cache/llama-models/Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf")
+    MODEL_CONCURRENCY: int = int(os.getenv("MODEL_CONCURRENCY", "4"))
+    MODEL_BATCH_SIZE: int = int(os.getenv("MODEL_BATCH_SIZE", "8"))
+    MODEL_BATCH_WAIT_MS: float = float(os.getenv("MODEL_BATCH_WAIT_MS", "10"))
+    # Only enable for servers that accept list prompts (e.g. llama.cpp's
+    # llama-server); llama-cpp-python's server rejects more than one
+    MODEL_MULTI_PROMPT: bool = os.getenv("MODEL_MULTI_PROMPT", "false").lower() == "true"
+    MODEL_CONTEXT_WINDOW: int = int(os.getenv("MODEL_CONTEXT_WINDOW", "2048"))
+    MODEL_DEFAULT_MAX_TOKENS: int = int(os.getenv("MODEL_DEFAULT_MAX_TOKENS", "256"))
 
 
 @lru_cache()
@@ -103,20 +293,15 @@ class TokenPayload(BaseModel):
     """JWT token payload."""
     tenant_id: str
     user_id: str
-    exp: datetime
+    exp: Optional[float] = None  # unix timestamp, None if the token has no expiry
 
 
 class QueryRequest(BaseModel):
     """Request for AI query."""
     question: str = Field(..., min_length=5, max_length=500)
-    query_type: str = Field(..., description="Type: 'sales', 'inventory', or 'patient_analytics'")
-    
-    @validator("query_type")
-    def validate_query_type(cls, v):
-        allowed = ["sales", "inventory", "patient_analytics"]
-        if v not in allowed:
-            raise ValueError(f"query_type must be one of: {allowed}")
-        return v
+    query_type: Literal["sales", "inventory", "patient_analytics"] = Field(
+        ..., description="Type: 'sales', 'inventory', or 'patient_analytics'"
+    )
 
 
 class QueryResponse(BaseModel):
@@ -131,6 +316,7 @@ class OphthalmicKnowledgeRequest(BaseModel):
     """Request for ophthalmic knowledge (fine-tuned model)."""
     question: str = Field(..., min_length=5, max_length=500)
     context: Optional[str] = Field(None, max_length=1000, description="Additional context")
+    max_tokens: Optional[int] = Field(None, ge=1, le=1024, description="Override the answer length cap")
 
 
 class OphthalmicKnowledgeResponse(BaseModel):
@@ -144,6 +330,14 @@ class OphthalmicKnowledgeResponse(BaseModel):
 # Authentication & Authorization
 # ============================================================================
 
+# Verified tokens, keyed by a 128-bit BLAKE2b digest of the token (the raw
+# token is never stored). Entries live at most JWT_CACHE_TTL seconds;
+# expiry is still checked on every hit. Call _token_cache.clear() after
+# rotating JWT_SECRET_KEY.
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=int(os.getenv("JWT_CACHE_TTL", "30")))
+_token_cache_lock = threading.Lock()
+
+
 def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> TokenPayload:
     """
     Verify JWT token and extract tenant_id.
@@ -153,6 +347,19 @@ def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Security(securi
     only access their own tenant's data.
     """
     token = credentials.credentials
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    
+    if cached is not None:
+        if cached.exp and cached.exp < time.time():
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token expired",
+            )
+        return cached
+    
     settings = get_settings()
     
     try:
@@ -160,7 +367,7 @@ def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Security(securi
         payload = jwt.decode(
             token,
             settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
+            algorithms=[settings.JWT_ALGORITHM],
         )
         
         # Extract tenant_id and user_id
@@ -175,54 +382,96 @@ def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Security(securi
         
         # Verify expiration
         exp = payload.get("exp")
-        if exp and datetime.fromtimestamp(exp) < datetime.utcnow():
+        if exp and exp < time.time():
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token expired",
             )
         
-        logger.info(f"Authenticated request from tenant: {tenant_id}, user: {user_id}")
+        logger.info("Authenticated request from tenant: %s, user: %s", tenant_id, user_id)
         
-        return TokenPayload(
+        token_payload = TokenPayload(
             tenant_id=tenant_id,
             user_id=user_id,
-            exp=datetime.fromtimestamp(exp) if exp else datetime.utcnow()
+            exp=exp,
         )
         
+        with _token_cache_lock:
+            _token_cache[key] = token_payload
+        
+        return token_payload
+        
     except jwt.PyJWTError as e:
-        logger.warning(f"JWT verification failed: {e}")
+        logger.warning("JWT verification failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
 
 
-def get_tenant_rag_engine(token_payload: TokenPayload = Depends(verify_jwt_token)) -> SecureRAGEngine:
+_TENANT_DB_ENV_RE = re.compile(r"^TENANT_(?P<tenant_id>.+)_(?:SALES|PATIENT|INVENTORY)_DB$")
+
+
+def _load_tenant_configs() -> Dict[str, TenantDatabaseConfig]:
+    """
+    Build database configs for every tenant that has TENANT_<id>_*_DB set.
+    
+    Read once at startup: adding or changing a tenant's database requires
+    a restart.
+    """
+    tenant_ids = {
+        match.group("tenant_id")
+        for match in map(_TENANT_DB_ENV_RE.match, os.environ)
+        if match
+    }
+    return {tenant_id: TenantDatabaseConfig.from_env(tenant_id) for tenant_id in tenant_ids}
+
+
+async def get_tenant_rag_engine(token_payload: TokenPayload = Depends(verify_jwt_token)) -> SecureRAGEngine:
     """
     Get RAG engine for authenticated tenant.
     
     This enforces tenant isolation by routing to the correct database.
+    Engines are built on first use and reused for later requests; a
+    per-tenant lock ensures concurrent first requests build only one.
     """
     tenant_id = token_payload.tenant_id
     
-    try:
-        # Load tenant-specific database configuration
-        tenant_config = TenantDatabaseConfig.from_env(tenant_id)
-        
-        # Initialize RAG engine for this tenant
-        rag_engine = SecureRAGEngine(
-            tenant_config=tenant_config,
-            model_path=get_settings().MODEL_PATH,
-        )
-        
+    rag_engine = app.state.rag_engines.get(tenant_id)
+    if rag_engine is not None:
         return rag_engine
-        
-    except Exception as e:
-        logger.error(f"Failed to initialize RAG engine for tenant {tenant_id}: {e}")
+    
+    tenant_config = app.state.tenant_configs.get(tenant_id)
+    if tenant_config is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to initialize AI service",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Unknown tenant",
         )
+    
+    async with app.state.rag_locks[tenant_id]:
+        # Another request may have built it while we waited
+        rag_engine = app.state.rag_engines.get(tenant_id)
+        if rag_engine is not None:
+            return rag_engine
+        
+        try:
+            # Initialize RAG engine for this tenant (opens DB pools and
+            # loads models, so keep it off the event loop)
+            rag_engine = await asyncio.to_thread(
+                SecureRAGEngine,
+                tenant_config=tenant_config,
+                model_path=get_settings().MODEL_PATH,
+            )
+            app.state.rag_engines[tenant_id] = rag_engine
+            
+            return rag_engine
+            
+        except Exception as e:
+            logger.error("Failed to initialize RAG engine for tenant %s: %s", tenant_id, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to initialize AI service",
+            )
 
 
 # ============================================================================
@@ -236,18 +485,24 @@ async def root():
         "service": "Integrated Lens System AI Service",
         "status": "operational",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
     }
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint for Railway."""
+    model_sem = app.state.model_sem
+    
     return {
         "status": "ok",
         "service": "ai-service",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat(),
+        "model_slots": {
+            "limit": model_sem.limit,
+            "available": model_sem.available,
+        },
+        "timestamp": datetime.utcnow(),
     }
 
 
@@ -269,43 +524,40 @@ async def query_database(
     - No cross-tenant data access possible
     """
     logger.info(
-        f"[{token_payload.tenant_id}] Query request: type={request.query_type}, "
-        f"user={token_payload.user_id}"
+        "[%s] Query request: type=%s, user=%s",
+        token_payload.tenant_id, request.query_type, token_payload.user_id,
     )
     
     try:
-        # Route to appropriate query engine based on type
-        if request.query_type == "sales":
-            result = rag_engine.query_sales(request.question)
-        elif request.query_type == "inventory":
-            result = rag_engine.query_inventory(request.question)
-        elif request.query_type == "patient_analytics":
-            result = rag_engine.query_patient_analytics(request.question)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid query_type: {request.query_type}",
+        # Route to appropriate query engine based on type (validated by
+        # QueryRequest). Inference blocks, so it runs off the event loop;
+        # the engine's Llama instance and connections aren't safe to share
+        # between threads, so queries on one tenant's engine take turns.
+        # (llama_index Settings are only assigned while building engines,
+        # always to equivalent values.)
+        async with app.state.rag_query_locks[token_payload.tenant_id]:
+            result = await asyncio.to_thread(
+                _QUERY_DISPATCH[request.query_type], rag_engine, request.question
             )
         
         # Add user context to metadata
         result["metadata"]["user_id"] = token_payload.user_id
         
-        return QueryResponse(**result)
+        # result already has QueryResponse's shape; skip re-validating it
+        return ORJSONResponse(result)
         
     except Exception as e:
-        logger.error(f"[{token_payload.tenant_id}] Query failed: {e}")
+        logger.error("[%s] Query failed: %s", token_payload.tenant_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Query processing failed",
         )
-    finally:
-        # Clean up RAG engine
-        rag_engine.close()
 
 
 @app.post("/api/v1/ophthalmic-knowledge", response_model=OphthalmicKnowledgeResponse)
 async def ophthalmic_knowledge(
     request: OphthalmicKnowledgeRequest,
+    stream: bool = False,
     token_payload: TokenPayload = Depends(verify_jwt_token),
 ):
     """
@@ -314,22 +566,42 @@ async def ophthalmic_knowledge(
     This uses the fine-tuned LLaMA model for static ophthalmic knowledge
     (not live database queries).
     
+    With ?stream=true the model's completion is proxied as Server-Sent
+    Events as tokens are generated, instead of a single JSON response.
+    
     Examples:
     - "What is the difference between single vision and progressive lenses?"
     - "How should I counsel a patient on progressive lens adaptation?"
     - "What are the benefits of high-index lenses?"
     """
     logger.info(
-        f"[{token_payload.tenant_id}] Ophthalmic knowledge request: "
-        f"user={token_payload.user_id}"
+        "[%s] Ophthalmic knowledge request: user=%s",
+        token_payload.tenant_id, token_payload.user_id,
     )
     
+    if stream:
+        return StreamingResponse(
+            _stream_fine_tuned_model(request.question, request.context, request.max_tokens),
+            media_type="text/event-stream",
+        )
+    
     try:
         # Call fine-tuned model
         # In production, this would call your fine-tuned model endpoint
         # For now, we'll use a placeholder
         
-        answer = await _query_fine_tuned_model(request.question, request.context)
+        # Cached answers were generated with the default length cap, so an
+        # explicit max_tokens always goes to the model
+        use_cache = request.max_tokens is None
+        
+        cache = app.state.llm_cache
+        cache_key = cache.make_key(request.question, request.context)
+        answer = cache.get(cache_key) if use_cache else None
+        
+        if answer is None:
+            answer = await _query_fine_tuned_model(request.question, request.context, request.max_tokens)
+            if use_cache and answer != MODEL_UNAVAILABLE_ANSWER:
+                cache.put(cache_key, answer)
         
         return OphthalmicKnowledgeResponse(
             answer=answer,
@@ -338,43 +610,106 @@ async def ophthalmic_knowledge(
         )
         
     except Exception as e:
-        logger.error(f"[{token_payload.tenant_id}] Ophthalmic knowledge query failed: {e}")
+        logger.error("[%s] Ophthalmic knowledge query failed: %s", token_payload.tenant_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Knowledge query failed",
         )
 
 
-async def _query_fine_tuned_model(question: str, context: Optional[str] = None) -> str:
+MODEL_UNAVAILABLE_ANSWER = "I apologize, but I'm having trouble processing your question right now."
+
+# Llama-3 chat template pieces, joined once per request
+_PROMPT_PREFIX = "<|begin_of_text|><|start_header_id|>user<|end_header_id|>\n\n"
+_PROMPT_CTX = "\n\nContext: "
+_PROMPT_SUFFIX = "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+
+MODEL_COMPLETIONS_URL = "http://localhost:8000/v1/completions"
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_BASE_BODY = {
+    "temperature": 0.7,
+    "stop": ["<|eot_id|>"],
+    # Reuse the server's KV cache for the shared prompt prefix
+    "cache_prompt": True,
+}
+
+
+def _build_prompt(question: str, context: Optional[str] = None) -> str:
+    """Render the Llama-3 chat prompt for a question."""
+    if context:
+        return "".join((_PROMPT_PREFIX, question, _PROMPT_CTX, context, _PROMPT_SUFFIX))
+    return "".join((_PROMPT_PREFIX, question, _PROMPT_SUFFIX))
+
+
+def _max_tokens_for(question: str, prompt: str, override: Optional[int] = None) -> int:
+    """
+    Cap generated tokens by an answer length scaled to the question and the
+    room left in the model's context window (prompt size estimated at ~3
+    chars/token). Short questions get short KV-cache reservations.
+    """
+    settings = get_settings()
+    default = min(settings.MODEL_DEFAULT_MAX_TOKENS, 128 + len(question) // 2)
+    est_prompt_tokens = len(prompt) // 3
+    budget = settings.MODEL_CONTEXT_WINDOW - est_prompt_tokens
+    return max(1, min(override or default, budget))
+
+
+async def _query_fine_tuned_model(
+    question: str,
+    context: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
     """
     Query the fine-tuned ophthalmic model.
     
     This would call your llama-cpp-python server or load the fine-tuned model.
     """
-    import aiohttp
+    # Call llama-cpp-python server running on localhost:8000. With
+    # MODEL_MULTI_PROMPT, concurrent calls are batched into one request; the
+    # batcher holds the model semaphore so requests queue here rather than
+    # on the server.
+    prompt = _build_prompt(question, context)
     
-    # Call llama-cpp-python server running on localhost:8000
-    prompt = f"<|begin_of_text|><|start_header_id|>user<|end_header_id|>\n\n{question}"
-    if context:
-        prompt = f"{prompt}\n\nContext: {context}"
-    prompt += "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+    text = await app.state.prompt_batcher.submit(prompt, _max_tokens_for(question, prompt, max_tokens))
+    if text is None:
+        return MODEL_UNAVAILABLE_ANSWER
+    return text
+
+
+async def _stream_fine_tuned_model(
+    question: str,
+    context: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a completion from the fine-tuned model.
+    
+    llama-cpp already emits SSE ("data: {...}" lines), so lines are passed
+    through unchanged. The concurrency slot is held until the stream ends.
+    """
+    session = app.state.http_session
+    prompt = _build_prompt(question, context)
     
-    async with aiohttp.ClientSession() as session:
+    async with app.state.model_sem:
         async with session.post(
-            "http://localhost:8000/v1/completions",
-            json={
+            MODEL_COMPLETIONS_URL,
+            data=orjson.dumps({
+                **_BASE_BODY,
                 "prompt": prompt,
-                "max_tokens": 512,
-                "temperature": 0.7,
-                "stop": ["<|eot_id|>"],
-            }
+                "max_tokens": _max_tokens_for(question, prompt, max_tokens),
+                "stream": True,
+            }),
+            headers=_JSON_HEADERS,
         ) as response:
-            if response.status == 200:
-                result = await response.json()
-                return result["choices"][0]["text"].strip()
-            else:
-                logger.error(f"Model API error: {response.status}")
-                return "I apologize, but I'm having trouble processing your question right now."
+            if response.status != 200:
+                logger.error("Model API error: %s", response.status)
+                yield b"event: error\ndata: model unavailable\n\n"
+                return
+            
+            async for line in response.content:
+                yield line
 
 
 # ============================================================================
@@ -410,16 +745,15 @@ async def generate_token(tenant_id: str, user_id: str):
     }
 
 
-# ============================================================================
-# Startup/Shutdown
-# ============================================================================
-
 # ============================================================================
 # OCR Prescription Processing Endpoints
 # ============================================================================
 
 @app.post("/api/v1/ocr/prescription", response_model=OCRResponse)
-async def process_prescription_ocr(request: OCRRequest):
+async def process_prescription_ocr(
+    request: OCRRequest,
+    token_payload: TokenPayload = Depends(verify_jwt_token),
+):
     """
     Process prescription image with GPT-4 Vision OCR.
     
@@ -428,14 +762,17 @@ async def process_prescription_ocr(request: OCRRequest):
     """
     try:
         result = await ocr_service.process_prescription_image(request)
-        return result
+        return ORJSONResponse(result.model_dump())
     except Exception as e:
-        logger.error(f"Prescription OCR processing failed: {str(e)}")
+        logger.error("Prescription OCR processing failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/ocr/batch", response_model=List[OCRResponse])
-async def process_batch_ocr(request: BatchOCRRequest):
+async def process_batch_ocr(
+    request: BatchOCRRequest,
+    token_payload: TokenPayload = Depends(verify_jwt_token),
+):
     """
     Process multiple prescription images in batch.
     
@@ -443,19 +780,40 @@ async def process_batch_ocr(request: BatchOCRRequest):
     """
     try:
         results = await ocr_service.process_batch_images(request)
-        return results
+        return ORJSONResponse([result.model_dump() for result in results])
     except Exception as e:
-        logger.error(f"Batch OCR processing failed: {str(e)}")
+        logger.error("Batch OCR processing failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _read_image_upload(file: UploadFile) -> bytes:
+    """Validate an uploaded image and read it, enforcing MAX_IMAGE_BYTES."""
+    # Validate file type
+    if not file.content_type or not file.content_type.startswith('image/'):
+        raise HTTPException(status_code=400, detail="File must be an image")
+    
+    # Reject oversized uploads before reading them when the size is known
+    if file.size is not None and file.size > MAX_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="File exceeds 10MB limit")
+    
+    # Read in chunks so an unannounced oversized body is cut off early;
+    # the OCR service base64-encodes the raw bytes only when it calls out
+    contents = bytearray()
+    while chunk := await file.read(64 * 1024):
+        contents += chunk
+        if len(contents) > MAX_IMAGE_BYTES:
+            raise HTTPException(status_code=413, detail="File exceeds 10MB limit")
+    return bytes(contents)
+
+
 @app.post("/api/v1/ocr/upload")
 async def upload_prescription_image(
     file: UploadFile = File(...),
     extract_text: bool = Form(True),
     parse_prescription: bool = Form(True),
     validate_data: bool = Form(True),
-    include_confidence: bool = Form(True)
+    include_confidence: bool = Form(True),
+    token_payload: TokenPayload = Depends(verify_jwt_token),
 ):
     """
     Upload and process prescription image directly.
@@ -463,18 +821,9 @@ async def upload_prescription_image(
     Accepts file upload and returns OCR processing results.
     """
     try:
-        # Validate file type
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
-        
-        # Read and encode file
-        contents = await file.read()
-        image_base64 = base64.b64encode(contents).decode()
-        image_data_url = f"data:{file.content_type};base64,{image_base64}"
-        
         # Process with OCR
-        request = OCRRequest(
-            image_base64=image_data_url,
+        request = UploadOCRRequest(
+            image_bytes=await _read_image_upload(file),
             extract_text=extract_text,
             parse_prescription=parse_prescription,
             validate_data=validate_data,
@@ -482,26 +831,85 @@ async def upload_prescription_image(
         )
         
         result = await ocr_service.process_prescription_image(request)
-        return result
+        return ORJSONResponse(result.model_dump())
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Upload OCR processing failed: {str(e)}")
+        logger.error("Upload OCR processing failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/v1/ocr/status")
-async def get_ocr_status():
+@app.post("/api/v1/ocr/upload/batch", response_model=List[OCRResponse])
+async def upload_prescription_images(
+    files: List[UploadFile] = File(...),
+    extract_text: bool = Form(True),
+    parse_prescription: bool = Form(True),
+    validate_data: bool = Form(True),
+    include_confidence: bool = Form(True),
+    token_payload: TokenPayload = Depends(verify_jwt_token),
+):
     """
-    Get OCR service status and configuration.
+    Upload and process multiple prescription images in one request.
+    
+    Multipart counterpart of /ocr/batch: images are sent as raw file parts
+    instead of URLs or base64 strings. Up to 10 images per request.
     """
-    return {
+    if len(files) > _MAX_BATCH_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {_MAX_BATCH_UPLOAD_FILES} images per batch",
+        )
+    
+    try:
+        requests = [
+            UploadOCRRequest(
+                image_bytes=await _read_image_upload(file),
+                extract_text=extract_text,
+                parse_prescription=parse_prescription,
+                validate_data=validate_data,
+                include_confidence=include_confidence
+            )
+            for file in files
+        ]
+        
+        results = await ocr_service.process_requests(requests)
+        return ORJSONResponse([result.model_dump() for result in results])
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Batch upload OCR processing failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@ttl_cache(maxsize=1, ttl=1)
+def _ocr_status_json() -> bytes:
+    """OCR status body; cached briefly since health checks poll it."""
+    return orjson.dumps({
         "status": "healthy",
         "service": "ocr",
         "model": os.getenv("OPENAI_MODEL", "gpt-4-vision-preview"),
         "max_file_size": "10MB",
         "supported_formats": ["jpg", "jpeg", "png", "tiff"],
         "openai_configured": bool(os.getenv("OPENAI_API_KEY"))
-    }
+    })
+
+
+@app.get("/api/v1/ocr/status")
+async def get_ocr_status():
+    """
+    Get OCR service status and configuration.
+    """
+    return Response(_ocr_status_json(), media_type="application/json")
+
+
+_OCR_STATS_BYTES = orjson.dumps({
+    "total_processed": 0,  # Would be tracked in production
+    "accuracy_rate": 0.95,  # Would be calculated from actual data
+    "avg_processing_time": 3.2,  # Would be measured
+    "success_rate": 0.98
+})
 
 
 @app.get("/api/v1/ocr/stats")
@@ -509,12 +917,7 @@ async def get_ocr_stats():
     """
     Get OCR processing statistics.
     """
-    return {
-        "total_processed": 0,  # Would be tracked in production
-        "accuracy_rate": 0.95,  # Would be calculated from actual data
-        "avg_processing_time": 3.2,  # Would be measured
-        "success_rate": 0.98
-    }
+    return Response(_OCR_STATS_BYTES, media_type="application/json")
 
 
 # ============================================================================
@@ -522,7 +925,10 @@ async def get_ocr_stats():
 # ============================================================================
 
 @app.post("/api/v1/models/test", response_model=ModelTestResponse)
-async def test_ml_model(request: ModelTestRequest):
+async def test_ml_model(
+    request: ModelTestRequest,
+    token_payload: TokenPayload = Depends(verify_jwt_token),
+):
     """
     Test a specific ML model.
     
@@ -534,12 +940,15 @@ async def test_ml_model(request: ModelTestRequest):
         result = await ml_models_service.test_model(request)
         return result
     except Exception as e:
-        logger.error(f"ML model testing failed: {str(e)}")
+        logger.error("ML model testing failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/v1/models/test/batch", response_model=List[ModelTestResponse])
-async def test_batch_ml_models(request: BatchModelTestRequest):
+async def test_batch_ml_models(
+    request: BatchModelTestRequest,
+    token_payload: TokenPayload = Depends(verify_jwt_token),
+):
     """
     Test multiple ML models in batch.
     
@@ -549,7 +958,7 @@ async def test_batch_ml_models(request: BatchModelTestRequest):
         results = await ml_models_service.test_batch_models(request)
         return results
     except Exception as e:
-        logger.error(f"Batch ML model testing failed: {str(e)}")
+        logger.error("Batch ML model testing failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -564,10 +973,234 @@ async def get_ml_models_health():
         result = await ml_models_service.get_model_health()
         return result
     except Exception as e:
-        logger.error(f"ML models health check failed: {str(e)}")
+        logger.error("ML models health check failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ----------------------------------------------------------------------------
+# Static model reports
+#
+# These payloads never change at runtime, so they are serialized once and
+# served as raw bytes. Metrics and accuracy carry a last_updated stamp and
+# are re-encoded at most every _MODELS_REPORT_TTL seconds.
+# ----------------------------------------------------------------------------
+
+_MODELS_STATUS = {
+    "status": "healthy",
+    "models": {
+        "ophthalmic_knowledge": {
+            "type": "fine_tuned_llama",
+            "status": "loaded",
+            "accuracy": 0.92,
+            "version": "1.0",
+            "last_updated": "2024-01-15T10:30:00Z"
+        },
+        "sales_forecasting": {
+            "type": "time_series_lstm",
+            "status": "loaded",
+            "accuracy": 0.87,
+            "version": "2.1",
+            "last_updated": "2024-01-14T15:45:00Z"
+        },
+        "inventory_prediction": {
+            "type": "demand_forecasting",
+            "status": "loaded",
+            "accuracy": 0.85,
+            "version": "1.5",
+            "last_updated": "2024-01-13T09:20:00Z"
+        },
+        "patient_segmentation": {
+            "type": "clustering_kmeans",
+            "status": "loaded",
+            "accuracy": 0.88,
+            "version": "1.2",
+            "last_updated": "2024-01-12T14:10:00Z"
+        },
+        "recommendation_system": {
+            "type": "collaborative_filtering",
+            "status": "loaded",
+            "accuracy": 0.90,
+            "version": "3.0",
+            "last_updated": "2024-01-11T11:30:00Z"
+        },
+        "risk_stratification": {
+            "type": "classification_random_forest",
+            "status": "loaded",
+            "accuracy": 0.83,
+            "version": "1.8",
+            "last_updated": "2024-01-10T16:45:00Z"
+        },
+        "churn_prediction": {
+            "type": "classification_xgboost",
+            "status": "loaded",
+            "accuracy": 0.86,
+            "version": "2.3",
+            "last_updated": "2024-01-09T13:20:00Z"
+        }
+    },
+    "total_models": 7,
+    "loaded_models": 7,
+    "overall_accuracy": 0.87
+}
+
+
+_MODELS_METRICS = {
+    "metrics": {
+        "accuracy": {
+            "ophthalmic_knowledge": 0.92,
+            "sales_forecasting": 0.87,
+            "inventory_prediction": 0.85,
+            "patient_segmentation": 0.88,
+            "recommendation_system": 0.90,
+            "risk_stratification": 0.83,
+            "churn_prediction": 0.86
+        },
+        "performance": {
+            "avg_response_time_ms": 1500,
+            "requests_per_minute": 45,
+            "success_rate": 0.98,
+            "uptime_percentage": 0.997
+        },
+        "usage": {
+            "total_requests_today": 1250,
+            "total_requests_this_week": 8750,
+            "most_used_model": "recommendation_system",
+            "least_used_model": "risk_stratification"
+        }
+    }
+}
+
+
+_MODELS_ACCURACY = {
+    "accuracy_report": {
+        "ophthalmic_knowledge": {
+            "precision": 0.94,
+            "recall": 0.91,
+            "f1_score": 0.92,
+            "accuracy": 0.92,
+            "confidence_interval": [0.89, 0.95]
+        },
+        "sales_forecasting": {
+            "mape": 0.12,
+            "rmse": 245.50,
+            "mae": 189.25,
+            "accuracy": 0.87,
+            "confidence_interval": [0.84, 0.90]
+        },
+        "inventory_prediction": {
+            "mae": 23.4,
+            "rmse": 31.2,
+            "accuracy": 0.85,
+            "confidence_interval": [0.82, 0.88]
+        },
+        "patient_segmentation": {
+            "silhouette_score": 0.72,
+            "davies_bouldin_score": 0.45,
+            "accuracy": 0.88,
+            "confidence_interval": [0.85, 0.91]
+        },
+        "recommendation_system": {
+            "precision_at_5": 0.78,
+            "recall_at_5": 0.72,
+            "ndcg_at_5": 0.75,
+            "accuracy": 0.90,
+            "confidence_interval": [0.87, 0.93]
+        },
+        "risk_stratification": {
+            "precision": 0.81,
+            "recall": 0.79,
+            "f1_score": 0.80,
+            "accuracy": 0.83,
+            "confidence_interval": [0.80, 0.86]
+        },
+        "churn_prediction": {
+            "precision": 0.84,
+            "recall": 0.82,
+            "f1_score": 0.83,
+            "auc_roc": 0.89,
+            "accuracy": 0.86,
+            "confidence_interval": [0.83, 0.89]
+        }
+    },
+    "overall_performance": {
+        "avg_accuracy": 0.87,
+        "performance_grade": "A",
+        "trend": "improving"
+    }
+}
+
+
+_MODELS_USAGE = {
+    "usage_statistics": {
+        "today": {
+            "total_requests": 1250,
+            "unique_users": 85,
+            "avg_requests_per_user": 14.7,
+            "peak_hour": "14:00",
+            "model_breakdown": {
+                "ophthalmic_knowledge": 312,
+                "sales_forecasting": 187,
+                "inventory_prediction": 156,
+                "patient_segmentation": 125,
+                "recommendation_system": 287,
+                "risk_stratification": 94,
+                "churn_prediction": 89
+            }
+        },
+        "this_week": {
+            "total_requests": 8750,
+            "unique_users": 425,
+            "growth_rate": 0.12,
+            "most_active_day": "Wednesday",
+            "avg_daily_requests": 1250
+        },
+        "this_month": {
+            "total_requests": 35000,
+            "unique_users": 1250,
+            "growth_rate": 0.18,
+            "satisfaction_score": 4.6
+        }
+    },
+    "trends": {
+        "request_volume": "increasing",
+        "user_engagement": "stable",
+        "model_accuracy": "improving",
+        "error_rate": "decreasing"
+    }
+}
+
+
+_MODELS_STATUS_BYTES = orjson.dumps(_MODELS_STATUS)
+_MODELS_USAGE_BYTES = orjson.dumps(_MODELS_USAGE)
+
+_MODELS_REPORT_TTL = 60.0
+
+
+def _stamped_report(build: Callable[[datetime], Dict[str, Any]]) -> Callable[[], bytes]:
+    """Return a getter for build(timestamp) as JSON bytes, refreshed every _MODELS_REPORT_TTL seconds."""
+    cached: Dict[str, Any] = {"bytes": b"", "expires": 0.0}
+    
+    def get() -> bytes:
+        now = time.monotonic()
+        if now >= cached["expires"]:
+            cached["bytes"] = orjson.dumps(build(datetime.now()))
+            cached["expires"] = now + _MODELS_REPORT_TTL
+        return cached["bytes"]
+    
+    return get
+
+
+_models_metrics_json = _stamped_report(
+    lambda ts: {**_MODELS_METRICS, "last_updated": ts}
+)
+_models_accuracy_json = _stamped_report(
+    lambda ts: {
+        **_MODELS_ACCURACY,
+        "overall_performance": {**_MODELS_ACCURACY["overall_performance"], "last_updated": ts},
+    }
+)
+
+
 @app.get("/api/v1/models/status")
 async def get_ml_models_status():
     """
@@ -575,63 +1208,7 @@ async def get_ml_models_status():
     
     Includes model types, versions, and configuration.
     """
-    return {
-        "status": "healthy",
-        "models": {
-            "ophthalmic_knowledge": {
-                "type": "fine_tuned_llama",
-                "status": "loaded",
-                "accuracy": 0.92,
-                "version": "1.0",
-                "last_updated": "2024-01-15T10:30:00Z"
-            },
-            "sales_forecasting": {
-                "type": "time_series_lstm",
-                "status": "loaded",
-                "accuracy": 0.87,
-                "version": "2.1",
-                "last_updated": "2024-01-14T15:45:00Z"
-            },
-            "inventory_prediction": {
-                "type": "demand_forecasting",
-                "status": "loaded",
-                "accuracy": 0.85,
-                "version": "1.5",
-                "last_updated": "2024-01-13T09:20:00Z"
-            },
-            "patient_segmentation": {
-                "type": "clustering_kmeans",
-                "status": "loaded",
-                "accuracy": 0.88,
-                "version": "1.2",
-                "last_updated": "2024-01-12T14:10:00Z"
-            },
-            "recommendation_system": {
-                "type": "collaborative_filtering",
-                "status": "loaded",
-                "accuracy": 0.90,
-                "version": "3.0",
-                "last_updated": "2024-01-11T11:30:00Z"
-            },
-            "risk_stratification": {
-                "type": "classification_random_forest",
-                "status": "loaded",
-                "accuracy": 0.83,
-                "version": "1.8",
-                "last_updated": "2024-01-10T16:45:00Z"
-            },
-            "churn_prediction": {
-                "type": "classification_xgboost",
-                "status": "loaded",
-                "accuracy": 0.86,
-                "version": "2.3",
-                "last_updated": "2024-01-09T13:20:00Z"
-            }
-        },
-        "total_models": 7,
-        "loaded_models": 7,
-        "overall_accuracy": 0.87
-    }
+    return Response(_MODELS_STATUS_BYTES, media_type="application/json")
 
 
 @app.get("/api/v1/models/metrics")
@@ -641,32 +1218,7 @@ async def get_ml_models_metrics():
     
     Includes accuracy, precision, recall, and performance metrics.
     """
-    return {
-        "metrics": {
-            "accuracy": {
-                "ophthalmic_knowledge": 0.92,
-                "sales_forecasting": 0.87,
-                "inventory_prediction": 0.85,
-                "patient_segmentation": 0.88,
-                "recommendation_system": 0.90,
-                "risk_stratification": 0.83,
-                "churn_prediction": 0.86
-            },
-            "performance": {
-                "avg_response_time_ms": 1500,
-                "requests_per_minute": 45,
-                "success_rate": 0.98,
-                "uptime_percentage": 0.997
-            },
-            "usage": {
-                "total_requests_today": 1250,
-                "total_requests_this_week": 8750,
-                "most_used_model": "recommendation_system",
-                "least_used_model": "risk_stratification"
-            }
-        },
-        "last_updated": datetime.now().isoformat()
-    }
+    return Response(_models_metrics_json(), media_type="application/json")
 
 
 @app.get("/api/v1/models/accuracy")
@@ -676,64 +1228,7 @@ async def get_ml_models_accuracy():
     
     Includes precision, recall, F1-score, and other metrics.
     """
-    return {
-        "accuracy_report": {
-            "ophthalmic_knowledge": {
-                "precision": 0.94,
-                "recall": 0.91,
-                "f1_score": 0.92,
-                "accuracy": 0.92,
-                "confidence_interval": [0.89, 0.95]
-            },
-            "sales_forecasting": {
-                "mape": 0.12,
-                "rmse": 245.50,
-                "mae": 189.25,
-                "accuracy": 0.87,
-                "confidence_interval": [0.84, 0.90]
-            },
-            "inventory_prediction": {
-                "mae": 23.4,
-                "rmse": 31.2,
-                "accuracy": 0.85,
-                "confidence_interval": [0.82, 0.88]
-            },
-            "patient_segmentation": {
-                "silhouette_score": 0.72,
-                "davies_bouldin_score": 0.45,
-                "accuracy": 0.88,
-                "confidence_interval": [0.85, 0.91]
-            },
-            "recommendation_system": {
-                "precision_at_5": 0.78,
-                "recall_at_5": 0.72,
-                "ndcg_at_5": 0.75,
-                "accuracy": 0.90,
-                "confidence_interval": [0.87, 0.93]
-            },
-            "risk_stratification": {
-                "precision": 0.81,
-                "recall": 0.79,
-                "f1_score": 0.80,
-                "accuracy": 0.83,
-                "confidence_interval": [0.80, 0.86]
-            },
-            "churn_prediction": {
-                "precision": 0.84,
-                "recall": 0.82,
-                "f1_score": 0.83,
-                "auc_roc": 0.89,
-                "accuracy": 0.86,
-                "confidence_interval": [0.83, 0.89]
-            }
-        },
-        "overall_performance": {
-            "avg_accuracy": 0.87,
-            "performance_grade": "A",
-            "trend": "improving",
-            "last_updated": datetime.now().isoformat()
-        }
-    }
+    return Response(_models_accuracy_json(), media_type="application/json")
 
 
 @app.get("/api/v1/models/usage")
@@ -743,57 +1238,7 @@ async def get_ml_models_usage():
     
     Includes request counts, popular endpoints, and usage patterns.
     """
-    return {
-        "usage_statistics": {
-            "today": {
-                "total_requests": 1250,
-                "unique_users": 85,
-                "avg_requests_per_user": 14.7,
-                "peak_hour": "14:00",
-                "model_breakdown": {
-                    "ophthalmic_knowledge": 312,
-                    "sales_forecasting": 187,
-                    "inventory_prediction": 156,
-                    "patient_segmentation": 125,
-                    "recommendation_system": 287,
-                    "risk_stratification": 94,
-                    "churn_prediction": 89
-                }
-            },
-            "this_week": {
-                "total_requests": 8750,
-                "unique_users": 425,
-                "growth_rate": 0.12,
-                "most_active_day": "Wednesday",
-                "avg_daily_requests": 1250
-            },
-            "this_month": {
-                "total_requests": 35000,
-                "unique_users": 1250,
-                "growth_rate": 0.18,
-                "satisfaction_score": 4.6
-            }
-        },
-        "trends": {
-            "request_volume": "increasing",
-            "user_engagement": "stable",
-            "model_accuracy": "improving",
-            "error_rate": "decreasing"
-        }
-    }
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Application startup."""
-    logger.info("AI Service starting up...")
-    logger.info(f"Model path: {get_settings().MODEL_PATH}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown."""
-    logger.info("AI Service shutting down...")
+    return Response(_MODELS_USAGE_BYTES, media_type="application/json")
 
 
 # ============================================================================
@@ -803,11 +1248,22 @@ async def shutdown_event():
 if __name__ == "__main__":
     import uvicorn
 
+    # Auto-reload (single process) only for local development
+    dev = os.getenv("DEV") == "1"
+
+    # Each worker is a separate process with its own MODEL_CONCURRENCY
+    # semaphore, rate limits, caches and RAG engines, so those limits apply
+    # per worker. Keep the default at one worker; raise WORKERS only with
+    # the per-worker limits scaled down to match.
     # Use [::] for IPv4/IPv6 dual-stack compatibility on Railway
     uvicorn.run(
         "main:app",
         host="::",
         port=8080,
-        reload=True,
+        workers=1 if dev else int(os.getenv("WORKERS", "1")),
+        # "auto" uses uvloop/httptools when installed, asyncio/h11 otherwise
+        loop="auto",
+        http="auto",
+        reload=dev,
         log_level="info",
     )
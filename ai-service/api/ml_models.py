@@ -12,17 +12,96 @@ Provides comprehensive testing for all machine learning models including:
 
 from fastapi import HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
 import numpy as np
+from cachetools import TTLCache
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
 import os
 import json
-import random
+import time
 
 logger = logging.getLogger(__name__)
 
+# Shared generator for the simulated test metrics
+_rng = np.random.default_rng()
+
+
+# ============================================================================
+# Test Fixtures
+# ============================================================================
+
+# Fixed inputs for the simulated model tests. Only their sizes feed the
+# simulations, so they are built once here rather than on every call.
+
+_OPHTHALMIC_TEST_QUESTIONS = (
+    "What is the difference between single vision and progressive lenses?",
+    "What lens material would you recommend for high prescriptions?",
+    "How do anti-reflective coatings work?",
+)
+
+_SALES_PERIODS = ("7d", "30d", "90d")
+_SALES_CATEGORIES = ("lenses", "frames", "contacts")
+_SALES_FORECASTS = len(_SALES_PERIODS) * len(_SALES_CATEGORIES)
+
+_INVENTORY_PRODUCTS = ("lens_progressive", "frame_full_rim", "contact_monthly")
+
+_SEGMENTATION_PATIENTS = 100
+_SEGMENTATION_CLUSTERS = 5
+
+_RECOMMENDATION_PRESCRIPTIONS = (
+    {"sphere": -2.50, "cylinder": -0.75, "axis": 180},
+    {"sphere": -4.00, "cylinder": -1.50, "axis": 90},
+    {"sphere": +1.50, "cylinder": 0, "axis": 0},
+)
+# Score bounds per recommended product: progressive_digital,
+# high_index_thin, anti_reflective
+_RECOMMENDATION_SCORE_LOW = (0.8, 0.7, 0.6)
+_RECOMMENDATION_SCORE_HIGH = (0.95, 0.9, 0.85)
+
+_RISK_TEST_PATIENTS = (
+    {"age": 45, "risk_factors": ["high_prescription", "diabetes"]},
+    {"age": 30, "risk_factors": ["mild_astigmatism"]},
+    {"age": 65, "risk_factors": ["glaucoma", "cataracts"]},
+)
+
+_CHURN_TEST_CUSTOMERS = (
+    {"tenure": 12, "usage": "high", "satisfaction": 0.9},
+    {"tenure": 3, "usage": "low", "satisfaction": 0.3},
+    {"tenure": 24, "usage": "medium", "satisfaction": 0.7},
+)
+
+
+# ============================================================================
+# Simulation Kernels
+# ============================================================================
+
+def _prediction_error_kernel(
+    n: int,
+    low: float,
+    high: float,
+    spread: float,
+    threshold: float,
+) -> Tuple[float, float, float]:
+    """
+    Simulate n predictions of actuals drawn from [low, high) with a relative
+    error of up to +/-spread.
+    
+    Returns (mean relative error, share of predictions under threshold,
+    mean absolute error).
+    """
+    actual = _rng.uniform(low, high, n)
+    predicted = actual * _rng.uniform(1 - spread, 1 + spread, n)
+    abs_error = np.abs(predicted - actual)
+    error_rate = abs_error / actual
+    return (
+        float(error_rate.mean()),
+        float((error_rate < threshold).mean()),
+        float(abs_error.mean()),
+    )
+
 # ============================================================================
 # Models
 # ============================================================================
@@ -33,6 +112,7 @@ class ModelTestRequest(BaseModel):
     test_data: Optional[Dict[str, Any]] = None
     test_scenario: Optional[str] = None
     confidence_threshold: Optional[float] = 0.8
+    cache: bool = Field(False, description="Reuse a recent result for the same model and test data (e.g. for health sweeps)")
 
 class ModelTestResponse(BaseModel):
     """Response from model testing."""
@@ -42,10 +122,11 @@ class ModelTestResponse(BaseModel):
     accuracy_metrics: Optional[Dict[str, float]] = None
     performance_metrics: Optional[Dict[str, float]] = None
     errors: Optional[List[str]] = None
+    from_cache: bool = False
 
 class BatchModelTestRequest(BaseModel):
     """Request for batch model testing."""
-    models: List[str] = Field(..., min_items=1, max_items=10)
+    models: List[str] = Field(..., min_length=1, max_length=10)
     test_scenarios: Optional[List[str]] = None
 
 class ModelHealthResponse(BaseModel):
@@ -72,33 +153,53 @@ class MLModelsService:
             "risk_stratification": {"loaded": True, "accuracy": 0.83, "last_test": datetime.now()},
             "churn_prediction": {"loaded": True, "accuracy": 0.86, "last_test": datetime.now()}
         }
+        
+        # model_type -> test method
+        self._test_handlers = {
+            "ophthalmic_knowledge": self._test_ophthalmic_knowledge,
+            "sales_forecasting": self._test_sales_forecasting,
+            "inventory_prediction": self._test_inventory_prediction,
+            "patient_segmentation": self._test_patient_segmentation,
+            "recommendation_system": self._test_recommendation_system,
+            "risk_stratification": self._test_risk_stratification,
+            "churn_prediction": self._test_churn_prediction,
+        }
+        
+        self._recompute_overall_health()
+        
+        # (model_type, test_data JSON) -> recent successful ModelTestResponse
+        self._result_cache: TTLCache = TTLCache(
+            maxsize=256,
+            ttl=float(os.getenv("MODEL_TEST_CACHE_TTL", "60")),
+        )
+    
+    def _recompute_overall_health(self):
+        """Refresh the cached mean accuracy; call after changing models_status."""
+        accuracies = [status["accuracy"] for status in self.models_status.values()]
+        self._overall_health = sum(accuracies) / len(accuracies)
     
     async def test_model(self, request: ModelTestRequest) -> ModelTestResponse:
         """Test a specific ML model."""
+        cache_key = (request.model_type, json.dumps(request.test_data, sort_keys=True))
+        if request.cache:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                # A copy, so callers can't alter the cached result; its
+                # performance_metrics are from the run that produced it
+                return cached.model_copy(update={"from_cache": True}, deep=True)
+        
         try:
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             
             # Route to appropriate test method
-            if request.model_type == "ophthalmic_knowledge":
-                results = await self._test_ophthalmic_knowledge(request.test_data)
-            elif request.model_type == "sales_forecasting":
-                results = await self._test_sales_forecasting(request.test_data)
-            elif request.model_type == "inventory_prediction":
-                results = await self._test_inventory_prediction(request.test_data)
-            elif request.model_type == "patient_segmentation":
-                results = await self._test_patient_segmentation(request.test_data)
-            elif request.model_type == "recommendation_system":
-                results = await self._test_recommendation_system(request.test_data)
-            elif request.model_type == "risk_stratification":
-                results = await self._test_risk_stratification(request.test_data)
-            elif request.model_type == "churn_prediction":
-                results = await self._test_churn_prediction(request.test_data)
-            else:
+            handler = self._test_handlers.get(request.model_type)
+            if handler is None:
                 raise HTTPException(status_code=400, detail=f"Unknown model type: {request.model_type}")
+            results = await handler(request.test_data)
             
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             
-            return ModelTestResponse(
+            response = ModelTestResponse(
                 success=True,
                 model_type=request.model_type,
                 test_results=results["test_results"],
@@ -108,9 +209,11 @@ class MLModelsService:
                     "response_time_ms": processing_time * 1000
                 }
             )
+            self._result_cache[cache_key] = response
+            return response
             
         except Exception as e:
-            logger.error(f"Model testing failed for {request.model_type}: {str(e)}")
+            logger.error("Model testing failed for %s: %s", request.model_type, e)
             return ModelTestResponse(
                 success=False,
                 model_type=request.model_type,
@@ -120,24 +223,19 @@ class MLModelsService:
     
     async def test_batch_models(self, request: BatchModelTestRequest) -> List[ModelTestResponse]:
         """Test multiple models in batch."""
-        results = []
-        
-        for model_type in request.models:
-            test_request = ModelTestRequest(
+        # test_model turns failures into unsuccessful responses, so one bad
+        # model type doesn't fail the batch; gather preserves request order
+        return await asyncio.gather(*(
+            self.test_model(ModelTestRequest(
                 model_type=model_type,
                 test_scenario="batch_test"
-            )
-            
-            result = await self.test_model(test_request)
-            results.append(result)
-        
-        return results
+            ))
+            for model_type in request.models
+        ))
     
     async def get_model_health(self) -> ModelHealthResponse:
         """Get health status of all models."""
-        overall_health = np.mean([
-            status["accuracy"] for status in self.models_status.values()
-        ])
+        overall_health = self._overall_health
         
         return ModelHealthResponse(
             status="healthy" if overall_health > 0.8 else "degraded",
@@ -148,112 +246,66 @@ class MLModelsService:
     
     async def _test_ophthalmic_knowledge(self, test_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Test ophthalmic knowledge model."""
-        # Simulate knowledge model testing
-        test_questions = [
-            "What is the difference between single vision and progressive lenses?",
-            "What lens material would you recommend for high prescriptions?",
-            "How do anti-reflective coatings work?"
-        ]
-        
-        results = []
-        for question in test_questions:
-            # Simulate model response
-            confidence = random.uniform(0.85, 0.95)
-            response_time = random.uniform(1.0, 2.0)
-            
-            results.append({
-                "question": question,
-                "confidence": confidence,
-                "response_time": response_time,
-                "success": confidence > 0.8
-            })
+        # Simulate model responses, one draw per question
+        n = len(_OPHTHALMIC_TEST_QUESTIONS)
+        confidence = _rng.uniform(0.85, 0.95, n)
+        response_time = _rng.uniform(1.0, 2.0, n)
         
-        accuracy = np.mean([r["confidence"] for r in results])
+        accuracy = float(confidence.mean())
         
         return {
             "test_results": {
-                "questions_tested": len(test_questions),
-                "success_rate": sum(r["success"] for r in results) / len(results),
+                "questions_tested": n,
+                "success_rate": float((confidence > 0.8).mean()),
                 "avg_confidence": accuracy,
-                "avg_response_time": np.mean([r["response_time"] for r in results])
+                "avg_response_time": float(response_time.mean())
             },
             "accuracy_metrics": {
                 "accuracy": accuracy,
-                "precision": random.uniform(0.88, 0.94),
-                "recall": random.uniform(0.85, 0.92)
+                "precision": float(_rng.uniform(0.88, 0.94)),
+                "recall": float(_rng.uniform(0.85, 0.92))
             }
         }
     
     async def _test_sales_forecasting(self, test_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Test sales forecasting model."""
-        # Simulate forecasting test
-        periods = ["7d", "30d", "90d"]
-        categories = ["lenses", "frames", "contacts"]
-        
-        results = []
-        for period in periods:
-            for category in categories:
-                # Simulate forecast
-                actual = random.uniform(1000, 10000)
-                predicted = actual * random.uniform(0.9, 1.1)
-                mape = abs(predicted - actual) / actual
-                
-                results.append({
-                    "period": period,
-                    "category": category,
-                    "actual": actual,
-                    "predicted": predicted,
-                    "mape": mape,
-                    "success": mape < 0.2
-                })
+        # Simulate one forecast per (period, category)
+        n = _SALES_FORECASTS
+        avg_mape, success_rate, _ = _prediction_error_kernel(n, 1000, 10000, 0.1, 0.2)
         
-        accuracy = 1 - np.mean([r["mape"] for r in results])
+        accuracy = 1 - avg_mape
         
         return {
             "test_results": {
-                "forecasts_tested": len(results),
-                "success_rate": sum(r["success"] for r in results) / len(results),
-                "avg_mape": np.mean([r["mape"] for r in results]),
+                "forecasts_tested": n,
+                "success_rate": success_rate,
+                "avg_mape": avg_mape,
                 "accuracy": accuracy
             },
             "accuracy_metrics": {
-                "mape": np.mean([r["mape"] for r in results]),
-                "rmse": random.uniform(100, 500),
+                "mape": avg_mape,
+                "rmse": float(_rng.uniform(100, 500)),
                 "accuracy": accuracy
             }
         }
     
     async def _test_inventory_prediction(self, test_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Test inventory prediction model."""
-        # Simulate inventory prediction test
-        products = ["lens_progressive", "frame_full_rim", "contact_monthly"]
+        # Simulate one demand prediction per product
+        n = len(_INVENTORY_PRODUCTS)
+        avg_error_rate, success_rate, mae = _prediction_error_kernel(n, 50, 500, 0.15, 0.25)
         
-        results = []
-        for product in products:
-            # Simulate demand prediction
-            actual_demand = random.uniform(50, 500)
-            predicted_demand = actual_demand * random.uniform(0.85, 1.15)
-            error_rate = abs(predicted_demand - actual_demand) / actual_demand
-            
-            results.append({
-                "product": product,
-                "actual_demand": actual_demand,
-                "predicted_demand": predicted_demand,
-                "error_rate": error_rate,
-                "success": error_rate < 0.25
-            })
-        
-        accuracy = 1 - np.mean([r["error_rate"] for r in results])
+        accuracy = 1 - avg_error_rate
         
         return {
             "test_results": {
-                "products_tested": len(products),
-                "success_rate": sum(r["success"] for r in results) / len(results),
-                "avg_error_rate": np.mean([r["error_rate"] for r in results]),
+                "products_tested": n,
+                "success_rate": success_rate,
+                "avg_error_rate": avg_error_rate,
                 "accuracy": accuracy
             },
             "accuracy_metrics": {
-                "mae": np.mean([abs(r["predicted_demand"] - r["actual_demand"]) for r in results]),
+                "mae": mae,
                 "accuracy": accuracy
             }
         }
@@ -261,19 +313,12 @@ class MLModelsService:
     async def _test_patient_segmentation(self, test_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Test patient segmentation model."""
         # Simulate segmentation test
-        n_patients = 100
-        n_clusters = 5
-        
-        # Generate synthetic patient data
-        patient_data = {
-            "purchase_frequency": np.random.exponential(2, n_patients),
-            "avg_order_value": np.random.normal(300, 100, n_patients),
-            "prescription_complexity": np.random.uniform(0, 1, n_patients)
-        }
+        n_patients = _SEGMENTATION_PATIENTS
+        n_clusters = _SEGMENTATION_CLUSTERS
         
         # Simulate clustering results
-        silhouette_score = random.uniform(0.6, 0.8)
-        cluster_quality = random.uniform(0.7, 0.9)
+        silhouette_score = float(_rng.uniform(0.6, 0.8))
+        cluster_quality = float(_rng.uniform(0.7, 0.9))
         
         return {
             "test_results": {
@@ -292,123 +337,74 @@ class MLModelsService:
     
     async def _test_recommendation_system(self, test_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Test recommendation system."""
-        # Simulate recommendation test
-        test_prescriptions = [
-            {"sphere": -2.50, "cylinder": -0.75, "axis": 180},
-            {"sphere": -4.00, "cylinder": -1.50, "axis": 90},
-            {"sphere": +1.50, "cylinder": 0, "axis": 0}
-        ]
-        
-        results = []
-        for prescription in test_prescriptions:
-            # Simulate recommendation generation
-            recommendations = [
-                {"product": "progressive_digital", "score": random.uniform(0.8, 0.95)},
-                {"product": "high_index_thin", "score": random.uniform(0.7, 0.9)},
-                {"product": "anti_reflective", "score": random.uniform(0.6, 0.85)}
-            ]
-            
-            avg_score = np.mean([r["score"] for r in recommendations])
-            
-            results.append({
-                "prescription": prescription,
-                "recommendations": recommendations,
-                "avg_score": avg_score,
-                "success": avg_score > 0.7
-            })
+        # Simulate a score for each (prescription, product) recommendation
+        n = len(_RECOMMENDATION_PRESCRIPTIONS)
+        scores = _rng.uniform(
+            _RECOMMENDATION_SCORE_LOW,
+            _RECOMMENDATION_SCORE_HIGH,
+            size=(n, len(_RECOMMENDATION_SCORE_LOW)),
+        )
+        avg_score = scores.mean(axis=1)
         
-        precision = np.mean([r["avg_score"] for r in results])
+        precision = float(avg_score.mean())
+        recall = float(_rng.uniform(0.7, 0.85))
         
         return {
             "test_results": {
-                "prescriptions_tested": len(test_prescriptions),
-                "success_rate": sum(r["success"] for r in results) / len(results),
+                "prescriptions_tested": n,
+                "success_rate": float((avg_score > 0.7).mean()),
                 "avg_recommendation_score": precision,
-                "recommendations_generated": len(results) * 3
+                "recommendations_generated": int(scores.size)
             },
             "accuracy_metrics": {
                 "precision": precision,
-                "recall": random.uniform(0.7, 0.85),
-                "f1_score": 2 * (precision * random.uniform(0.7, 0.85)) / (precision + random.uniform(0.7, 0.85))
+                "recall": recall,
+                "f1_score": 2 * precision * recall / (precision + recall)
             }
         }
     
     async def _test_risk_stratification(self, test_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Test risk stratification model."""
-        # Simulate risk assessment test
-        test_patients = [
-            {"age": 45, "risk_factors": ["high_prescription", "diabetes"]},
-            {"age": 30, "risk_factors": ["mild_astigmatism"]},
-            {"age": 65, "risk_factors": ["glaucoma", "cataracts"]}
-        ]
-        
-        results = []
-        for patient in test_patients:
-            # Simulate risk calculation
-            risk_score = random.uniform(0.1, 0.9)
-            risk_level = "low" if risk_score < 0.3 else "medium" if risk_score < 0.7 else "high"
-            
-            results.append({
-                "patient": patient,
-                "risk_score": risk_score,
-                "risk_level": risk_level,
-                "confidence": random.uniform(0.8, 0.95),
-                "success": risk_score > 0.1
-            })
+        # Simulate one risk score per patient
+        n = len(_RISK_TEST_PATIENTS)
+        risk_score = _rng.uniform(0.1, 0.9, n)
         
-        accuracy = random.uniform(0.8, 0.9)
+        accuracy = float(_rng.uniform(0.8, 0.9))
         
         return {
             "test_results": {
-                "patients_assessed": len(test_patients),
-                "success_rate": sum(r["success"] for r in results) / len(results),
-                "avg_risk_score": np.mean([r["risk_score"] for r in results]),
+                "patients_assessed": n,
+                "success_rate": float((risk_score > 0.1).mean()),
+                "avg_risk_score": float(risk_score.mean()),
                 "accuracy": accuracy
             },
             "accuracy_metrics": {
                 "accuracy": accuracy,
-                "sensitivity": random.uniform(0.75, 0.9),
-                "specificity": random.uniform(0.8, 0.95)
+                "sensitivity": float(_rng.uniform(0.75, 0.9)),
+                "specificity": float(_rng.uniform(0.8, 0.95))
             }
         }
     
     async def _test_churn_prediction(self, test_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Test churn prediction model."""
-        # Simulate churn prediction test
-        test_customers = [
-            {"tenure": 12, "usage": "high", "satisfaction": 0.9},
-            {"tenure": 3, "usage": "low", "satisfaction": 0.3},
-            {"tenure": 24, "usage": "medium", "satisfaction": 0.7}
-        ]
-        
-        results = []
-        for customer in test_customers:
-            # Simulate churn prediction
-            churn_probability = random.uniform(0.05, 0.8)
-            predicted_churn = churn_probability > 0.5
-            
-            results.append({
-                "customer": customer,
-                "churn_probability": churn_probability,
-                "predicted_churn": predicted_churn,
-                "confidence": random.uniform(0.75, 0.9),
-                "success": True  # Simulate successful prediction
-            })
+        # Simulate one churn probability per customer
+        n = len(_CHURN_TEST_CUSTOMERS)
+        churn_probability = _rng.uniform(0.05, 0.8, n)
         
-        accuracy = random.uniform(0.82, 0.88)
+        accuracy = float(_rng.uniform(0.82, 0.88))
         
         return {
             "test_results": {
-                "customers_analyzed": len(test_customers),
-                "success_rate": sum(r["success"] for r in results) / len(results),
-                "avg_churn_probability": np.mean([r["churn_probability"] for r in results]),
+                "customers_analyzed": n,
+                "success_rate": 1.0,  # Simulate successful predictions
+                "avg_churn_probability": float(churn_probability.mean()),
                 "accuracy": accuracy
             },
             "accuracy_metrics": {
                 "accuracy": accuracy,
-                "precision": random.uniform(0.8, 0.9),
-                "recall": random.uniform(0.75, 0.85),
-                "auc_roc": random.uniform(0.85, 0.95)
+                "precision": float(_rng.uniform(0.8, 0.9)),
+                "recall": float(_rng.uniform(0.75, 0.85)),
+                "auc_roc": float(_rng.uniform(0.85, 0.95))
             }
         }
 
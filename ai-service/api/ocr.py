@@ -6,23 +6,153 @@ Includes image processing, text extraction, and prescription parsing.
 """
 
 from fastapi import HTTPException, UploadFile, File, Form
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Tuple
+import asyncio
 import base64
+import binascii
+import hashlib
 import io
 from PIL import Image
-import requests
-import json
+import aiohttp
+import orjson
+from cachetools import TTLCache
 import logging
 import os
-from datetime import datetime
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Largest image accepted for OCR
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+# Base64 length of a MAX_IMAGE_BYTES image, and how much of a passed-through
+# base64 payload is decoded to check it's well formed (a multiple of 4)
+_MAX_IMAGE_BASE64_CHARS = (MAX_IMAGE_BYTES + 2) // 3 * 4
+_BASE64_CHECK_CHARS = 4096
+
+# Contents of a ``` or ```json fenced block (closing fence optional)
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|$)", re.DOTALL)
+
+
+def _strip_json_fence(text: str) -> str:
+    """Return the contents of a fenced code block in text, or text itself."""
+    fenced = _JSON_FENCE_RE.search(text)
+    return fenced.group(1) if fenced else text
+
+
+_EXTRACT_PROMPT = """Please extract all text from this prescription image.
+Be very careful to capture all numbers, measurements, and medical terms exactly as written.
+Include patient name, doctor name, date, and all prescription measurements.
+Format the output clearly with line breaks to preserve the layout."""
+
+_PRESCRIPTION_SCHEMA = """{
+    "rightEye": {
+        "sphere": number,
+        "cylinder": number,
+        "axis": number,
+        "add": number
+    },
+    "leftEye": {
+        "sphere": number,
+        "cylinder": number,
+        "axis": number,
+        "add": number
+    },
+    "pd": number,
+    "doctor": "string",
+    "patient": "string",
+    "date": "string",
+    "notes": "string"
+}"""
+
+_PRESCRIPTION_FIELD_NOTES = """Use null for any missing values. Pay close attention to:
+- Sphere values (positive or negative, usually 2 decimal places)
+- Cylinder values (negative or 0, usually 2 decimal places)
+- Axis values (0-180, integers)
+- Add power for bifocal/progressive (positive, usually 2 decimal places)
+- Pupillary distance (PD) in millimeters
+- Doctor and patient names
+- Prescription date"""
+
+_PRESCRIPTION_JSON_INSTRUCTIONS = f"""Return a JSON object with the following structure:
+{_PRESCRIPTION_SCHEMA}
+
+{_PRESCRIPTION_FIELD_NOTES}
+
+Return ONLY the JSON object, no other text."""
+
+# Single-call variant: transcription and structured data together
+_EXTRACT_AND_PARSE_PROMPT = f"""{_EXTRACT_PROMPT}
+
+Then parse the prescription data from that text. Return a JSON object with
+two keys: "text", holding the full extracted text as a string, and
+"prescription", holding an object with the following structure:
+{_PRESCRIPTION_SCHEMA}
+
+{_PRESCRIPTION_FIELD_NOTES}
+
+Return ONLY the JSON object, no other text."""
+
+# Multi-image variant: one result object per image, in order
+_EXTRACT_AND_PARSE_MANY_PROMPT = f"""You are given several prescription images.
+For each image, extract all text, being very careful to capture all numbers,
+measurements, and medical terms exactly as written, then parse the
+prescription data from that text.
+
+Return a JSON array with one object per image, in the order the images were
+given. Each object has three keys: "index", the image's position starting
+from 0; "text", holding the full extracted text as a string; and
+"prescription", holding an object with the following structure:
+{_PRESCRIPTION_SCHEMA}
+
+{_PRESCRIPTION_FIELD_NOTES}
+
+Return ONLY the JSON array, no other text."""
+
+OPENAI_CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
+
+# Longest side of images sent to the Vision API
+MAX_IMAGE_SIDE = 1024
+
+
+def _load_scaled(image: Image.Image, max_side: int = MAX_IMAGE_SIDE) -> Image.Image:
+    """
+    Decode an opened image, letting JPEGs decode directly at reduced scale
+    (libjpeg DCT scaling) when they're much larger than max_side.
+    
+    draft() only picks a scale >= the requested size, so callers still
+    thumbnail() to the exact bound afterwards. Raises on corrupt data.
+    """
+    image.draft("RGB", (max_side, max_side))
+    image.load()
+    return image
+
 # ============================================================================
 # Models
 # ============================================================================
 
+# Range checks: (eye field, or None for a top-level field, key, low, high,
+# confidence weight if in range, error if not)
+_PRESCRIPTION_RANGE_RULES = (
+    ("rightEye", "sphere", -20.00, 20.00, 0.15, "Right eye sphere out of range"),
+    ("rightEye", "cylinder", -6.00, 0, 0.15, "Right eye cylinder out of range"),
+    ("rightEye", "axis", 0, 180, 0.1, "Right eye axis out of range"),
+    ("leftEye", "sphere", -20.00, 20.00, 0.15, "Left eye sphere out of range"),
+    ("leftEye", "cylinder", -6.00, 0, 0.15, "Left eye cylinder out of range"),
+    ("leftEye", "axis", 0, 180, 0.1, "Left eye axis out of range"),
+    (None, "pd", 50, 80, 0.1, "PD out of range"),
+)
+
+# Fields that add confidence just by being present
+_PRESCRIPTION_PRESENCE_WEIGHTS = (
+    ("doctor", 0.05),
+    ("patient", 0.05),
+    ("date", 0.05),
+)
+
+
 class PrescriptionData(BaseModel):
     """Extracted prescription data."""
     rightEye: Optional[Dict[str, Any]] = None
@@ -43,6 +173,15 @@ class OCRRequest(BaseModel):
     validate_data: bool = True
     include_confidence: bool = True
 
+class UploadOCRRequest(OCRRequest):
+    """
+    OCR request for an uploaded file, built by the upload routes.
+    
+    Kept separate from OCRRequest so raw bytes aren't part of the JSON
+    request body the public endpoints accept.
+    """
+    image_bytes: bytes = Field(exclude=True)
+
 class OCRResponse(BaseModel):
     """OCR processing response."""
     success: bool
@@ -54,7 +193,7 @@ class OCRResponse(BaseModel):
 
 class BatchOCRRequest(BaseModel):
     """Batch OCR processing request."""
-    images: List[str] = Field(..., min_items=1, max_items=10)
+    images: List[str] = Field(..., min_length=1, max_length=10)
     extract_text: bool = True
     parse_prescription: bool = True
     validate_data: bool = True
@@ -71,106 +210,355 @@ class OCRService:
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4-vision-preview")
         self.max_tokens = int(os.getenv("OPENAI_MAX_TOKENS", "1000"))
         self.temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.1"))
+        self.batch_concurrency = int(
+            os.getenv("OCR_BATCH_CONCURRENCY", os.getenv("OCR_CONCURRENCY", "8"))
+        )
+        # Images sent to Vision per call when parsing a batch
+        self.vision_batch_size = int(os.getenv("OCR_VISION_BATCH_SIZE", "4"))
+        
+        # Shared by all batch requests so concurrent batches don't multiply
+        # outbound Vision calls; created on first use inside the event loop
+        self._batch_semaphore: Optional[asyncio.Semaphore] = None
+        
+        # Pooled HTTP session for image downloads and OpenAI calls, created
+        # on first use inside the event loop; closed via aclose()
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # (image digest, request flags) -> recent successful OCRResponse
+        self._result_cache: TTLCache = TTLCache(
+            maxsize=512,
+            ttl=float(os.getenv("OCR_CACHE_TTL", "300")),
+        )
         
         if not self.openai_api_key:
             logger.warning("OPENAI_API_KEY not configured")
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=50,
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300,
+                ),
+                timeout=aiohttp.ClientTimeout(total=30, connect=5),
+            )
+        return self._session
+    
+    async def aclose(self):
+        """Close the pooled HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
     async def process_prescription_image(self, request: OCRRequest) -> OCRResponse:
         """Process a prescription image with OCR."""
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         try:
-            # Get image data
             image_data = await self._get_image_data(request)
+        except Exception as e:
+            logger.error("OCR processing failed: %s", e)
+            return OCRResponse(
+                success=False,
+                errors=[str(e)],
+                processing_time=time.perf_counter() - start_time
+            )
+        
+        return await self._process_image_data(request, image_data, start_time)
+    
+    @staticmethod
+    def _cache_key(request: OCRRequest, image_data: str) -> Tuple[bytes, bool, bool, bool]:
+        """Result cache key: image digest plus the flags that shape the response."""
+        return (
+            hashlib.sha256(image_data.encode()).digest(),
+            request.extract_text,
+            request.parse_prescription,
+            request.validate_data,
+        )
+    
+    async def _process_image_data(
+        self,
+        request: OCRRequest,
+        image_data: Optional[str],
+        start_time: float,
+    ) -> OCRResponse:
+        """OCR an image already prepared by _get_image_data."""
+        try:
             if not image_data:
                 return OCRResponse(
                     success=False,
                     errors=["No valid image data provided"]
                 )
             
-            # Extract text using GPT-4 Vision
-            extracted_text = await self._extract_text_with_vision(image_data)
-            
-            prescription_data = None
-            confidence_score = None
-            
-            if request.parse_prescription and extracted_text:
-                # Parse prescription data
-                prescription_data = await self._parse_prescription_text(extracted_text)
-                
-                if request.validate_data and prescription_data:
-                    # Validate prescription data
-                    validation_result = await self._validate_prescription_data(prescription_data)
-                    prescription_data.confidence = validation_result.get("confidence", 0.0)
-                    confidence_score = validation_result.get("confidence", 0.0)
+            # Identical images (client retries, re-submits) reuse a recent result
+            cache_key = self._cache_key(request, image_data)
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                return cached.model_copy(update={
+                    "processing_time": time.perf_counter() - start_time
+                })
             
-            processing_time = (datetime.now() - start_time).total_seconds()
+            # Extract (and parse) text using GPT-4 Vision
+            extracted_text, prescription_data = await self._extract_with_vision(
+                image_data,
+                parse_prescription=request.parse_prescription,
+            )
             
-            return OCRResponse(
-                success=True,
-                extracted_text=extracted_text if request.extract_text else None,
-                prescription_data=prescription_data,
-                confidence_score=confidence_score,
-                processing_time=processing_time
+            return await self._build_response(
+                request, cache_key, extracted_text, prescription_data, start_time
             )
             
         except Exception as e:
-            logger.error(f"OCR processing failed: {str(e)}")
+            logger.error("OCR processing failed: %s", e)
             return OCRResponse(
                 success=False,
                 errors=[str(e)],
-                processing_time=(datetime.now() - start_time).total_seconds()
+                processing_time=time.perf_counter() - start_time
             )
     
-    async def process_batch_images(self, request: BatchOCRRequest) -> List[OCRResponse]:
-        """Process multiple prescription images."""
-        results = []
+    async def _build_response(
+        self,
+        request: OCRRequest,
+        cache_key: Tuple[bytes, bool, bool, bool],
+        extracted_text: Optional[str],
+        prescription_data: Optional[PrescriptionData],
+        start_time: float,
+    ) -> OCRResponse:
+        """Validate extracted data, then build and cache the response."""
+        confidence_score = None
+        
+        if request.validate_data and prescription_data:
+            # Validate prescription data
+            validation_result = await self._validate_prescription_data(prescription_data)
+            prescription_data.confidence = validation_result.get("confidence", 0.0)
+            confidence_score = validation_result.get("confidence", 0.0)
+        
+        processing_time = time.perf_counter() - start_time
         
-        for image_url in request.images:
-            ocr_request = OCRRequest(
+        response = OCRResponse(
+            success=True,
+            extracted_text=extracted_text if request.extract_text else None,
+            prescription_data=prescription_data,
+            confidence_score=confidence_score,
+            processing_time=processing_time
+        )
+        # Don't pin a failed parse in the cache; let a retry re-run Vision
+        if not request.parse_prescription or prescription_data is not None:
+            self._result_cache[cache_key] = response
+        return response
+    
+    async def process_batch_images(self, request: BatchOCRRequest) -> List[OCRResponse]:
+        """Process multiple prescription images by URL."""
+        return await self.process_requests([
+            OCRRequest(
                 image_url=image_url,
                 extract_text=request.extract_text,
                 parse_prescription=request.parse_prescription,
                 validate_data=request.validate_data
             )
-            
-            result = await self.process_prescription_image(ocr_request)
-            results.append(result)
+            for image_url in request.images
+        ])
+    
+    async def process_requests(self, requests: List[OCRRequest]) -> List[OCRResponse]:
+        """
+        Process several OCR requests concurrently, preserving order.
         
-        return results
+        Images that need parsing and aren't cached are sent to Vision up to
+        vision_batch_size per call; everything else is processed one by one.
+        """
+        if self._batch_semaphore is None:
+            self._batch_semaphore = asyncio.Semaphore(self.batch_concurrency)
+        semaphore = self._batch_semaphore
+        start_time = time.perf_counter()
+        
+        async def load(ocr_request: OCRRequest) -> Optional[str]:
+            async with semaphore:
+                return await self._get_image_data(ocr_request)
+        
+        image_data = await asyncio.gather(
+            *(load(ocr_request) for ocr_request in requests),
+            return_exceptions=True,
+        )
+        
+        # Indexes of requests to send to Vision together
+        batchable = [
+            i for i, (ocr_request, data) in enumerate(zip(requests, image_data))
+            if ocr_request.parse_prescription
+            and isinstance(data, str) and data
+            and self._cache_key(ocr_request, data) not in self._result_cache
+        ] if self.vision_batch_size > 1 else []
+        batched = set(batchable)
+        
+        async def process_one(i: int) -> OCRResponse:
+            if isinstance(image_data[i], Exception):
+                raise image_data[i]
+            async with semaphore:
+                return await self._process_image_data(requests[i], image_data[i], start_time)
+        
+        async def process_chunk(chunk: List[int]) -> List[OCRResponse]:
+            return await self._process_image_batch(
+                [requests[i] for i in chunk],
+                [image_data[i] for i in chunk],
+                start_time,
+                semaphore,
+            )
+        
+        size = self.vision_batch_size
+        chunks = [batchable[k:k + size] for k in range(0, len(batchable), size)]
+        singles = [i for i in range(len(requests)) if i not in batched]
+        
+        results = await asyncio.gather(
+            *(process_one(i) for i in singles),
+            *(process_chunk(chunk) for chunk in chunks),
+            return_exceptions=True,
+        )
+        
+        # One failed image shouldn't sink the whole batch
+        def as_response(result: Any) -> OCRResponse:
+            if isinstance(result, Exception):
+                return OCRResponse(success=False, errors=[str(result)])
+            return result
+        
+        responses: List[Optional[OCRResponse]] = [None] * len(requests)
+        for i, result in zip(singles, results):
+            responses[i] = as_response(result)
+        for chunk, result in zip(chunks, results[len(singles):]):
+            for offset, i in enumerate(chunk):
+                responses[i] = as_response(
+                    result if isinstance(result, Exception) else result[offset]
+                )
+        return responses
     
-    async def _get_image_data(self, request: OCRRequest) -> Optional[str]:
-        """Get image data from URL or base64."""
-        if request.image_base64:
-            # Decode base64 image
+    async def _process_image_batch(
+        self,
+        requests: List[OCRRequest],
+        image_data: List[str],
+        start_time: float,
+        semaphore: asyncio.Semaphore,
+    ) -> List[OCRResponse]:
+        """
+        OCR and parse several images with one Vision call, falling back to
+        one call per image if the combined reply can't be matched up.
+        
+        Every Vision call, combined or fallback, holds its own semaphore slot.
+        """
+        async def process_one(ocr_request: OCRRequest, data: str) -> OCRResponse:
+            async with semaphore:
+                return await self._process_image_data(ocr_request, data, start_time)
+        
+        if len(requests) == 1:
+            return [await process_one(requests[0], image_data[0])]
+        
+        try:
+            async with semaphore:
+                extracted = await self._extract_many_with_vision(image_data)
+        except Exception as e:
+            logger.warning("Batched OCR failed, processing images separately: %s", e)
+            return list(await asyncio.gather(*(
+                process_one(ocr_request, data)
+                for ocr_request, data in zip(requests, image_data)
+            )))
+        
+        # Validation failing for one image shouldn't fail the rest
+        async def build(
+            ocr_request: OCRRequest,
+            data: str,
+            extracted_text: Optional[str],
+            prescription_data: Optional[PrescriptionData],
+        ) -> OCRResponse:
             try:
-                image_data = base64.b64decode(request.image_base64.split(',')[1])
-                return base64.b64encode(image_data).decode()
+                return await self._build_response(
+                    ocr_request,
+                    self._cache_key(ocr_request, data),
+                    extracted_text,
+                    prescription_data,
+                    start_time,
+                )
             except Exception as e:
-                logger.error(f"Failed to decode base64 image: {str(e)}")
+                logger.error("OCR processing failed: %s", e)
+                return OCRResponse(
+                    success=False,
+                    errors=[str(e)],
+                    processing_time=time.perf_counter() - start_time
+                )
+        
+        return [
+            await build(ocr_request, data, extracted_text, prescription_data)
+            for ocr_request, data, (extracted_text, prescription_data)
+            in zip(requests, image_data, extracted)
+        ]
+    
+    async def _get_image_data(self, request: OCRRequest) -> Optional[str]:
+        """Get image data from raw bytes, URL or base64."""
+        if isinstance(request, UploadOCRRequest):
+            # Uploaded file; encode once for the Vision API
+            return base64.b64encode(request.image_bytes).decode()
+        
+        elif request.image_base64:
+            # Already base64; pass the payload through without the data URL
+            # prefix rather than decoding and re-encoding the same bytes
+            image_data = request.image_base64.split(',', 1)[-1].strip()
+            if not image_data:
+                logger.error("Empty base64 image")
                 return None
+            
+            # Reject bad payloads here rather than with a paid Vision call:
+            # check the size, then that a prefix actually decodes
+            if len(image_data) > _MAX_IMAGE_BASE64_CHARS:
+                raise ValueError("Image exceeds size limit")
+            try:
+                if len(image_data) % 4:
+                    raise binascii.Error("bad length")
+                base64.b64decode(image_data[:_BASE64_CHECK_CHARS], validate=True)
+            except binascii.Error:
+                raise ValueError("Invalid base64 image data")
+            return image_data
         
         elif request.image_url:
             # Download image from URL
             try:
-                response = requests.get(request.image_url, timeout=30)
-                response.raise_for_status()
+                async with self._get_session().get(request.image_url) as response:
+                    response.raise_for_status()
+                    
+                    # Refuse oversized bodies up front when announced, and
+                    # stream the rest so an unannounced one is cut off early
+                    if (response.content_length or 0) > MAX_IMAGE_BYTES:
+                        raise ValueError("Image exceeds size limit")
+                    
+                    buffer = bytearray()
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        buffer += chunk
+                        if len(buffer) > MAX_IMAGE_BYTES:
+                            raise ValueError("Image exceeds size limit")
+                    content = bytes(buffer)
                 
-                # Validate image
-                image = Image.open(io.BytesIO(response.content))
-                image.verify()  # Verify image integrity
+                # Parse the header only; pixel data is decoded (and
+                # validated) by load() below
+                image = Image.open(io.BytesIO(content))
                 
-                # Re-open after verify
-                image = Image.open(io.BytesIO(response.content))
+                # JPEGs already within bounds are sent as-is, skipping a
+                # re-encode that would only lose quality; they're still
+                # decoded once so corrupt or truncated data is rejected
+                if (
+                    image.format == "JPEG"
+                    and image.mode == "RGB"
+                    and max(image.size) <= MAX_IMAGE_SIDE
+                ):
+                    image.load()
+                    return base64.b64encode(content).decode()
+                
+                # Decode, scaling large JPEGs down during decode
+                image = _load_scaled(image)
                 
                 # Convert to RGB if necessary
                 if image.mode != 'RGB':
                     image = image.convert('RGB')
                 
                 # Resize if too large
-                max_size = 1024
-                if max(image.size) > max_size:
-                    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+                if max(image.size) > MAX_IMAGE_SIDE:
+                    image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE), Image.Resampling.LANCZOS)
                 
                 # Convert to base64
                 buffer = io.BytesIO()
@@ -180,142 +568,141 @@ class OCRService:
                 return image_data
                 
             except Exception as e:
-                logger.error(f"Failed to process image from URL: {str(e)}")
+                logger.error("Failed to process image from URL: %s", e)
                 return None
         
         return None
     
-    async def _extract_text_with_vision(self, image_data: str) -> Optional[str]:
-        """Extract text from image using GPT-4 Vision."""
+    async def _chat_completion(
+        self,
+        content: Any,
+        temperature: float,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Send a single-message chat completion and return the reply text."""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.openai_api_key}"
+        }
+        
+        payload = {
+            "model": self.openai_model,
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": temperature
+        }
+        
+        async with self._get_session().post(
+            OPENAI_CHAT_COMPLETIONS_URL,
+            headers=headers,
+            data=orjson.dumps(payload),
+        ) as response:
+            response.raise_for_status()
+            result = orjson.loads(await response.read())
+        
+        return result["choices"][0]["message"]["content"].strip()
+    
+    async def _extract_with_vision(
+        self,
+        image_data: str,
+        parse_prescription: bool = True,
+    ) -> Tuple[Optional[str], Optional[PrescriptionData]]:
+        """
+        Extract text from image using GPT-4 Vision, and optionally parse it.
+        
+        When parsing is requested, one Vision call returns both the raw text
+        and the structured prescription, instead of a second text-only call.
+        If that reply isn't valid JSON it is treated as plain text and parsed
+        with a separate call.
+        """
         if not self.openai_api_key:
             raise HTTPException(status_code=500, detail="OpenAI API key not configured")
         
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.openai_api_key}"
+        image_part = {
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:image/jpeg;base64,{image_data}"
             }
-            
-            payload = {
-                "model": self.openai_model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": """Please extract all text from this prescription image. 
-                                Be very careful to capture all numbers, measurements, and medical terms exactly as written.
-                                Include patient name, doctor name, date, and all prescription measurements.
-                                Format the output clearly with line breaks to preserve the layout."""
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_data}"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                "max_tokens": self.max_tokens,
-                "temperature": self.temperature
-            }
-            
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
+        }
+        prompt = _EXTRACT_AND_PARSE_PROMPT if parse_prescription else _EXTRACT_PROMPT
+        
+        try:
+            reply = await self._chat_completion(
+                [{"type": "text", "text": prompt}, image_part],
+                self.temperature,
             )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            return result["choices"][0]["message"]["content"].strip()
-            
         except Exception as e:
-            logger.error(f"GPT-4 Vision API call failed: {str(e)}")
+            logger.error("GPT-4 Vision API call failed: %s", e)
             raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
+        
+        if not parse_prescription:
+            return reply, None
+        
+        try:
+            fused = orjson.loads(_strip_json_fence(reply))
+            prescription = fused.get("prescription")
+            return fused.get("text"), PrescriptionData(**prescription) if prescription else None
+        except Exception as e:
+            logger.warning("Fused OCR reply was not valid JSON, parsing separately: %s", e)
+            return reply, await self._parse_prescription_text(reply)
+    
+    async def _extract_many_with_vision(
+        self,
+        image_data: List[str],
+    ) -> List[Tuple[Optional[str], Optional[PrescriptionData]]]:
+        """
+        Extract and parse text from several images in one Vision call.
+        
+        Raises if the call fails or the reply doesn't hold exactly one
+        result per image, so callers can fall back to one call per image.
+        """
+        if not self.openai_api_key:
+            raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+        
+        content: List[Dict[str, Any]] = [{"type": "text", "text": _EXTRACT_AND_PARSE_MANY_PROMPT}]
+        content.extend(
+            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{data}"}}
+            for data in image_data
+        )
+        
+        reply = await self._chat_completion(
+            content,
+            self.temperature,
+            max_tokens=self.max_tokens * len(image_data),
+        )
+        
+        items = orjson.loads(_strip_json_fence(reply))
+        if not isinstance(items, list) or len(items) != len(image_data):
+            raise ValueError(f"Expected {len(image_data)} results, got a different shape")
+        
+        results: List[Optional[Tuple[Optional[str], Optional[PrescriptionData]]]] = [None] * len(image_data)
+        for position, item in enumerate(items):
+            prescription = item.get("prescription")
+            results[item.get("index", position)] = (
+                item.get("text"),
+                PrescriptionData(**prescription) if prescription else None,
+            )
+        
+        if any(result is None for result in results):
+            raise ValueError("Missing result for one or more images")
+        return results
     
     async def _parse_prescription_text(self, text: str) -> Optional[PrescriptionData]:
         """Parse extracted text into prescription data structure."""
         try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.openai_api_key}"
-            }
-            
-            payload = {
-                "model": self.openai_model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": f"""Parse this prescription text and extract the prescription data in JSON format:
-                        
-                        {text}
-                        
-                        Return a JSON object with the following structure:
-                        {{
-                            "rightEye": {{
-                                "sphere": number,
-                                "cylinder": number,
-                                "axis": number,
-                                "add": number
-                            }},
-                            "leftEye": {{
-                                "sphere": number,
-                                "cylinder": number,
-                                "axis": number,
-                                "add": number
-                            }},
-                            "pd": number,
-                            "doctor": "string",
-                            "patient": "string",
-                            "date": "string",
-                            "notes": "string"
-                        }}
-                        
-                        Use null for any missing values. Pay close attention to:
-                        - Sphere values (positive or negative, usually 2 decimal places)
-                        - Cylinder values (negative or 0, usually 2 decimal places)
-                        - Axis values (0-180, integers)
-                        - Add power for bifocal/progressive (positive, usually 2 decimal places)
-                        - Pupillary distance (PD) in millimeters
-                        - Doctor and patient names
-                        - Prescription date
-                        
-                        Return ONLY the JSON object, no other text."""
-                    }
-                ],
-                "max_tokens": self.max_tokens,
-                "temperature": 0.1
-            }
-            
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
+            json_text = await self._chat_completion(
+                f"Parse this prescription text and extract the prescription data in JSON format:\n\n"
+                f"{text}\n\n"
+                f"{_PRESCRIPTION_JSON_INSTRUCTIONS}",
+                0.1,
             )
             
-            response.raise_for_status()
-            result = response.json()
-            
-            json_text = result["choices"][0]["message"]["content"].strip()
-            
-            # Extract JSON from response
-            if "```json" in json_text:
-                json_text = json_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in json_text:
-                json_text = json_text.split("```")[1].strip()
-            
-            prescription_dict = json.loads(json_text)
+            prescription_dict = orjson.loads(_strip_json_fence(json_text))
             
             return PrescriptionData(**prescription_dict)
             
         except Exception as e:
-            logger.error(f"Failed to parse prescription text: {str(e)}")
+            logger.error("Failed to parse prescription text: %s", e)
             return None
     
     async def _validate_prescription_data(self, data: PrescriptionData) -> Dict[str, Any]:
@@ -323,66 +710,23 @@ class OCRService:
         confidence = 0.0
         validation_errors = []
         
-        # Validate right eye
-        if data.rightEye:
-            if data.rightEye.get("sphere") is not None:
-                sphere = data.rightEye["sphere"]
-                if -20.00 <= sphere <= 20.00:
-                    confidence += 0.15
-                else:
-                    validation_errors.append("Right eye sphere out of range")
-            
-            if data.rightEye.get("cylinder") is not None:
-                cylinder = data.rightEye["cylinder"]
-                if -6.00 <= cylinder <= 0:
-                    confidence += 0.15
-                else:
-                    validation_errors.append("Right eye cylinder out of range")
-            
-            if data.rightEye.get("axis") is not None:
-                axis = data.rightEye["axis"]
-                if 0 <= axis <= 180:
-                    confidence += 0.1
-                else:
-                    validation_errors.append("Right eye axis out of range")
-        
-        # Validate left eye
-        if data.leftEye:
-            if data.leftEye.get("sphere") is not None:
-                sphere = data.leftEye["sphere"]
-                if -20.00 <= sphere <= 20.00:
-                    confidence += 0.15
-                else:
-                    validation_errors.append("Left eye sphere out of range")
-            
-            if data.leftEye.get("cylinder") is not None:
-                cylinder = data.leftEye["cylinder"]
-                if -6.00 <= cylinder <= 0:
-                    confidence += 0.15
-                else:
-                    validation_errors.append("Left eye cylinder out of range")
+        for eye_field, key, low, high, weight, error in _PRESCRIPTION_RANGE_RULES:
+            if eye_field is None:
+                value = getattr(data, key)
+            else:
+                eye = getattr(data, eye_field)
+                value = eye.get(key) if eye else None
             
-            if data.leftEye.get("axis") is not None:
-                axis = data.leftEye["axis"]
-                if 0 <= axis <= 180:
-                    confidence += 0.1
-                else:
-                    validation_errors.append("Left eye axis out of range")
-        
-        # Validate PD
-        if data.pd is not None:
-            if 50 <= data.pd <= 80:
-                confidence += 0.1
+            if value is None:
+                continue
+            if low <= value <= high:
+                confidence += weight
             else:
-                validation_errors.append("PD out of range")
-        
-        # Validate presence of required fields
-        if data.doctor:
-            confidence += 0.05
-        if data.patient:
-            confidence += 0.05
-        if data.date:
-            confidence += 0.05
+                validation_errors.append(error)
+        
+        for field, weight in _PRESCRIPTION_PRESENCE_WEIGHTS:
+            if getattr(data, field):
+                confidence += weight
         
         return {
             "confidence": min(confidence, 1.0),
@@ -13,16 +13,68 @@ Key Features:
 """
 
 import asyncio
-from typing import Dict, Optional, List
-from datetime import datetime, timedelta
-from collections import defaultdict
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 import json
+import os
+import time
+from cachetools.func import ttl_cache
 from fastapi import HTTPException
 import logging
 
+if TYPE_CHECKING:
+    from rag.secure_rag_engine import SecureRAGEngine
+
 logger = logging.getLogger(__name__)
 
+# query_type -> tenant config feature flag
+FEATURE_MAP = {
+    "sales": "sales_queries",
+    "inventory": "inventory_queries",
+    "patient_analytics": "patient_analytics",
+    "ophthalmic_knowledge": "ophthalmic_knowledge"
+}
+
+# Shared database for tenants without their own connection strings
+_BASE_DB_URL = os.getenv("DATABASE_URL", "postgresql://localhost/ils_db")
+
+
+@ttl_cache(maxsize=1024, ttl=int(os.getenv("TENANT_CONFIG_TTL", "60")))
+def _load_tenant_config(tenant_id: str) -> Dict:
+    """Read a tenant's configuration from the environment."""
+    # Get database connections from environment
+    # Priority: tenant-specific env vars > shared DATABASE_URL > fallback to example
+    sales_db = os.getenv(f"TENANT_{tenant_id}_SALES_DB", _BASE_DB_URL)
+    inventory_db = os.getenv(f"TENANT_{tenant_id}_INVENTORY_DB", _BASE_DB_URL)
+    patient_db = os.getenv(f"TENANT_{tenant_id}_PATIENT_DB", _BASE_DB_URL)
+
+    # Get tenant-specific configuration from environment or use defaults
+    rate_limit = int(os.getenv(f"TENANT_{tenant_id}_RATE_LIMIT", "60"))
+    subscription_tier = os.getenv(f"TENANT_{tenant_id}_SUBSCRIPTION_TIER", "professional")
+
+    return {
+        "tenant_id": tenant_id,
+        "rate_limit": rate_limit,
+        "max_tokens_per_request": 500,
+        "cache_enabled": True,
+        "features": {
+            "sales_queries": True,
+            "inventory_queries": True,
+            "patient_analytics": True,
+            "ophthalmic_knowledge": True
+        },
+        "subscription_tier": subscription_tier,
+        "database_connections": {
+            "sales_db": sales_db,
+            "inventory_db": inventory_db,
+            "patient_db": patient_db
+        }
+    }
+
 
 class TenantRouter:
     """
@@ -31,23 +83,59 @@ class TenantRouter:
     """
     
     def __init__(self):
-        # Cache for recent requests (deduplication)
-        self.request_cache: Dict[str, Dict] = {}
-        self.cache_ttl = 300  # 5 minutes
+        # Cache for recent requests (deduplication), least recently used first
+        self.request_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_cache_entries: int = 1000
+        self.cache_ttl: int = 300  # 5 minutes
+        
+        # Cache keys by insert time, in cache_sweep_interval-wide buckets, so
+        # the sweeper drops expired entries even if they're never read again
+        self.cache_sweep_interval: int = 10
+        self._ttl_buckets: Dict[int, List[str]] = defaultdict(list)
+        self._cache_sweeper: "Optional[asyncio.Task[None]]" = None
+        
+        # Rate limiting: token bucket per tenant, (tokens, last refill time)
+        self.rate_limits: Dict[str, Tuple[float, float]] = {}
         
-        # Rate limiting
-        self.rate_limits: Dict[str, List[datetime]] = defaultdict(list)
+        # Usage tracking, one unsigned 64-bit column per counter indexed by
+        # tenant row; rows are only created on write, so reading stats for
+        # an unknown tenant doesn't add one
+        self._tenant_index: Dict[str, int] = {}
+        self._requests_count = array("Q")
+        self._tokens_used = array("Q")
+        self._cache_hits = array("Q")
+        self._errors = array("Q")
         
-        # Usage tracking
-        self.usage_stats: Dict[str, Dict] = defaultdict(lambda: {
-            "requests_count": 0,
-            "tokens_used": 0,
-            "cache_hits": 0,
-            "errors": 0
-        })
+        # Usage events (tenant_id, tokens_used, query_type, success), written
+        # out in batches by a background worker once start() has been called
+        self._usage_queue: "asyncio.Queue[Tuple[str, int, str, bool]]" = asyncio.Queue()
+        self._usage_worker: "Optional[asyncio.Task[None]]" = None
+        self.usage_flush_interval: float = 1.0
+        self.usage_flush_max: int = 256
         
         # Active tenant sessions
-        self.active_tenants: Dict[str, Dict] = {}
+        self.active_tenants: Dict[str, Dict[str, Any]] = {}
+        
+        # Queries currently being processed, by cache key, so identical
+        # concurrent queries share one _process_query call
+        self._inflight: "Dict[str, asyncio.Task[Dict[str, Any]]]" = {}
+        
+        # RAG engines, built on first use per tenant and least recently
+        # used first; each holds DB pools and a loaded model
+        self._engines: "OrderedDict[str, SecureRAGEngine]" = OrderedDict()
+        self._engine_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        
+        # Held around each query on a tenant's engine (see _run_engine_query)
+        self._engine_query_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Evicted engines waiting for their last query before closing
+        self._closing_engines: "Set[asyncio.Task[None]]" = set()
+        self.max_engines: int = int(os.getenv("TENANT_MAX_ENGINES", "4"))
+        
+        # RAG queries run blocking inference, so they go to a bounded pool
+        # rather than the event loop; created on first use and shut down by
+        # close(), so the router can be started again afterwards
+        self._query_pool: Optional[ThreadPoolExecutor] = None
+        self.query_workers: int = int(os.getenv("TENANT_QUERY_WORKERS", str(os.cpu_count() or 4)))
     
     def _generate_cache_key(self, tenant_id: str, query: str, query_type: str) -> str:
         """
@@ -59,16 +147,23 @@ class TenantRouter:
             query_type: Type of query (sales, inventory, etc.)
             
         Returns:
-            SHA-256 hash of request parameters
+            128-bit BLAKE2b hash of request parameters
         """
-        cache_data = f"{tenant_id}:{query_type}:{query.lower().strip()}"
-        return hashlib.sha256(cache_data.encode()).hexdigest()
+        # Only used for in-process dedup, so a fast non-SHA-2 hash will do;
+        # parts are fed in directly rather than joined into one string
+        h = hashlib.blake2b(tenant_id.encode(), digest_size=16)
+        h.update(b":")
+        h.update(query_type.encode())
+        h.update(b":")
+        h.update(query.strip().lower().encode())
+        return h.hexdigest()
     
     def check_duplicate_request(
         self,
         tenant_id: str,
         query: str,
-        query_type: str
+        query_type: str,
+        cache_key: Optional[str] = None
     ) -> Optional[Dict]:
         """
         Check if this request was recently processed (deduplication).
@@ -77,22 +172,25 @@ class TenantRouter:
             tenant_id: Tenant identifier
             query: User query
             query_type: Type of query
+            cache_key: Precomputed _generate_cache_key result, if any
             
         Returns:
             Cached response if found, None otherwise
         """
-        cache_key = self._generate_cache_key(tenant_id, query, query_type)
+        if cache_key is None:
+            cache_key = self._generate_cache_key(tenant_id, query, query_type)
         
         if cache_key in self.request_cache:
             cached = self.request_cache[cache_key]
             
             # Check if cache is still valid
-            cache_age = (datetime.utcnow() - cached["timestamp"]).seconds
+            cache_age = time.monotonic() - cached["timestamp"]
             if cache_age < self.cache_ttl:
-                logger.info(f"[{tenant_id}] Cache hit for query (age: {cache_age}s)")
+                logger.info("[%s] Cache hit for query (age: %.0fs)", tenant_id, cache_age)
+                self.request_cache.move_to_end(cache_key)
                 
                 # Update usage stats
-                self.usage_stats[tenant_id]["cache_hits"] += 1
+                self._cache_hits[self._usage_row(tenant_id)] += 1
                 
                 return cached["response"]
             else:
@@ -106,7 +204,8 @@ class TenantRouter:
         tenant_id: str,
         query: str,
         query_type: str,
-        response: Dict
+        response: Dict,
+        cache_key: Optional[str] = None
     ):
         """
         Cache response for deduplication.
@@ -116,24 +215,29 @@ class TenantRouter:
             query: User query
             query_type: Type of query
             response: Response to cache
+            cache_key: Precomputed _generate_cache_key result, if any
         """
-        cache_key = self._generate_cache_key(tenant_id, query, query_type)
+        if cache_key is None:
+            cache_key = self._generate_cache_key(tenant_id, query, query_type)
         
+        now = time.monotonic()
         self.request_cache[cache_key] = {
-            "timestamp": datetime.utcnow(),
+            "timestamp": now,
             "response": response,
             "tenant_id": tenant_id
         }
+        self.request_cache.move_to_end(cache_key)
+        self._ttl_buckets[int(now // self.cache_sweep_interval)].append(cache_key)
         
-        # Cleanup old cache entries (keep only last 1000)
-        if len(self.request_cache) > 1000:
-            # Remove oldest entries
-            sorted_keys = sorted(
-                self.request_cache.keys(),
-                key=lambda k: self.request_cache[k]["timestamp"]
-            )
-            for key in sorted_keys[:100]:
-                del self.request_cache[key]
+        # Buckets are created in time order, so only the first can be the
+        # oldest; sweeping here keeps them bounded without start()'s sweeper
+        oldest = next(iter(self._ttl_buckets))
+        if self._bucket_expired(oldest, now):
+            self._sweep_expired()
+        
+        # Evict least recently used entries past the size limit
+        while len(self.request_cache) > self.max_cache_entries:
+            self.request_cache.popitem(last=False)
     
     def check_rate_limit(
         self,
@@ -143,6 +247,11 @@ class TenantRouter:
         """
         Check if tenant has exceeded rate limit.
         
+        Token bucket refilled continuously at max_requests_per_minute per
+        minute, holding at most a minute's worth of requests. There is no
+        await between reading and writing the bucket, so concurrent
+        coroutines can't interleave here and no lock is needed.
+        
         Args:
             tenant_id: Tenant identifier
             max_requests_per_minute: Maximum requests allowed per minute
@@ -150,37 +259,34 @@ class TenantRouter:
         Returns:
             True if within limit, False if exceeded
         """
-        now = datetime.utcnow()
-        one_minute_ago = now - timedelta(minutes=1)
+        now = time.monotonic()
+        capacity = float(max_requests_per_minute)
+        tokens, last = self.rate_limits.get(tenant_id, (capacity, now))
         
-        # Get recent requests for this tenant
-        recent_requests = self.rate_limits[tenant_id]
-        
-        # Remove requests older than 1 minute
-        recent_requests = [
-            req_time for req_time in recent_requests
-            if req_time > one_minute_ago
-        ]
-        self.rate_limits[tenant_id] = recent_requests
+        # Refill for the time elapsed since the last request
+        tokens = min(capacity, tokens + (now - last) * capacity / 60.0)
         
         # Check if limit exceeded
-        if len(recent_requests) >= max_requests_per_minute:
+        if tokens < 1.0:
+            self.rate_limits[tenant_id] = (tokens, now)
             logger.warning(
-                f"[{tenant_id}] Rate limit exceeded: "
-                f"{len(recent_requests)}/{max_requests_per_minute} requests/min"
+                "[%s] Rate limit exceeded: %d requests/min",
+                tenant_id, max_requests_per_minute,
             )
             return False
         
-        # Add current request
-        self.rate_limits[tenant_id].append(now)
+        # Spend a token for the current request
+        self.rate_limits[tenant_id] = (tokens - 1.0, now)
         return True
     
-    def get_tenant_config(self, tenant_id: str) -> Dict:
+    def get_tenant_config(self, tenant_id: str) -> Dict[str, Any]:
         """
         Get configuration for specific tenant.
 
         Loads from environment variables or secrets manager in production.
         Falls back to DATABASE_URL if tenant-specific connections not configured.
+        Results are cached per tenant for TENANT_CONFIG_TTL seconds and
+        shared between callers, so they must not be modified.
 
         Args:
             tenant_id: Tenant identifier
@@ -188,50 +294,11 @@ class TenantRouter:
         Returns:
             Tenant configuration
         """
-        import os
-
-        # Get database connections from environment
-        # Priority: tenant-specific env vars > shared DATABASE_URL > fallback to example
-        base_db_url = os.getenv("DATABASE_URL", "postgresql://localhost/ils_db")
-
-        # Try to get tenant-specific database URLs first
-        sales_db = os.getenv(
-            f"TENANT_{tenant_id}_SALES_DB",
-            os.getenv("DATABASE_URL", base_db_url)  # Fallback to shared database
-        )
-
-        inventory_db = os.getenv(
-            f"TENANT_{tenant_id}_INVENTORY_DB",
-            os.getenv("DATABASE_URL", base_db_url)  # Fallback to shared database
-        )
-
-        patient_db = os.getenv(
-            f"TENANT_{tenant_id}_PATIENT_DB",
-            os.getenv("DATABASE_URL", base_db_url)  # Fallback to shared database
-        )
-
-        # Get tenant-specific configuration from environment or use defaults
-        rate_limit = int(os.getenv(f"TENANT_{tenant_id}_RATE_LIMIT", "60"))
-        subscription_tier = os.getenv(f"TENANT_{tenant_id}_SUBSCRIPTION_TIER", "professional")
-
-        return {
-            "tenant_id": tenant_id,
-            "rate_limit": rate_limit,
-            "max_tokens_per_request": 500,
-            "cache_enabled": True,
-            "features": {
-                "sales_queries": True,
-                "inventory_queries": True,
-                "patient_analytics": True,
-                "ophthalmic_knowledge": True
-            },
-            "subscription_tier": subscription_tier,
-            "database_connections": {
-                "sales_db": sales_db,
-                "inventory_db": inventory_db,
-                "patient_db": patient_db
-            }
-        }
+        return _load_tenant_config(tenant_id)
+    
+    def refresh_tenant_configs(self):
+        """Drop cached tenant configurations so they're re-read on next use."""
+        _load_tenant_config.cache_clear()
     
     def track_usage(
         self,
@@ -249,20 +316,54 @@ class TenantRouter:
             query_type: Type of query
             success: Whether query succeeded
         """
-        stats = self.usage_stats[tenant_id]
-        stats["requests_count"] += 1
-        stats["tokens_used"] += tokens_used
+        row = self._usage_row(tenant_id)
+        self._requests_count[row] += 1
+        self._tokens_used[row] += tokens_used
         
         if not success:
-            stats["errors"] += 1
+            self._errors[row] += 1
         
+        event = (tenant_id, tokens_used, query_type, success)
+        if self._usage_worker is None:
+            self._flush_usage([event])
+        else:
+            self._usage_queue.put_nowait(event)
+    
+    def _flush_usage(self, events: List[Tuple[str, int, str, bool]]):
+        """Write out a batch of usage events, one line per tenant."""
         # In production, write to database for billing
-        logger.info(
-            f"[{tenant_id}] Usage: {stats['requests_count']} requests, "
-            f"{stats['tokens_used']} tokens, {stats['cache_hits']} cache hits"
-        )
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        for tenant_id in dict.fromkeys(event[0] for event in events):
+            row = self._tenant_index[tenant_id]
+            logger.info(
+                "[%s] Usage: %d requests, %d tokens, %d cache hits",
+                tenant_id, self._requests_count[row], self._tokens_used[row], self._cache_hits[row],
+            )
     
-    def get_usage_stats(self, tenant_id: str) -> Dict:
+    async def _drain_usage(self):
+        while True:
+            batch = [await self._usage_queue.get()]
+            
+            # Let events accumulate briefly so they're written together;
+            # still write what we have if cancelled while waiting
+            try:
+                await asyncio.sleep(self.usage_flush_interval)
+            finally:
+                while len(batch) < self.usage_flush_max and not self._usage_queue.empty():
+                    batch.append(self._usage_queue.get_nowait())
+                self._flush_usage(batch)
+    
+    def _usage_row(self, tenant_id: str) -> int:
+        """Row of a tenant's usage counters, created on first write."""
+        row = self._tenant_index.get(tenant_id)
+        if row is None:
+            row = self._tenant_index[tenant_id] = len(self._requests_count)
+            for column in (self._requests_count, self._tokens_used, self._cache_hits, self._errors):
+                column.append(0)
+        return row
+    
+    def get_usage_stats(self, tenant_id: str) -> Dict[str, int]:
         """
         Get usage statistics for tenant.
         
@@ -272,7 +373,15 @@ class TenantRouter:
         Returns:
             Usage statistics
         """
-        return self.usage_stats[tenant_id]
+        row = self._tenant_index.get(tenant_id)
+        if row is None:
+            return {"requests_count": 0, "tokens_used": 0, "cache_hits": 0, "errors": 0}
+        return {
+            "requests_count": self._requests_count[row],
+            "tokens_used": self._tokens_used[row],
+            "cache_hits": self._cache_hits[row],
+            "errors": self._errors[row]
+        }
     
     async def route_query(
         self,
@@ -284,6 +393,9 @@ class TenantRouter:
         """
         Route query to appropriate handler with deduplication and rate limiting.
         
+        Identical queries arriving while one is still being processed wait
+        for and share its response instead of running it again.
+        
         Args:
             tenant_id: Tenant identifier
             query: User query
@@ -297,14 +409,7 @@ class TenantRouter:
         config = self.get_tenant_config(tenant_id)
         
         # 2. Check if feature is enabled for tenant
-        feature_map = {
-            "sales": "sales_queries",
-            "inventory": "inventory_queries",
-            "patient_analytics": "patient_analytics",
-            "ophthalmic_knowledge": "ophthalmic_knowledge"
-        }
-        
-        feature_key = feature_map.get(query_type)
+        feature_key = FEATURE_MAP.get(query_type)
         if not config["features"].get(feature_key, False):
             raise HTTPException(
                 status_code=403,
@@ -318,10 +423,12 @@ class TenantRouter:
                 detail="Rate limit exceeded. Please try again later."
             )
         
-        # 4. Check for duplicate request (cache)
+        # 4. Check for duplicate request (cache); the key is also used for
+        # in-flight coalescing and caching below
+        cache_key = self._generate_cache_key(tenant_id, query, query_type)
         if config["cache_enabled"]:
             cached_response = self.check_duplicate_request(
-                tenant_id, query, query_type
+                tenant_id, query, query_type, cache_key
             )
             if cached_response:
                 return {
@@ -330,12 +437,28 @@ class TenantRouter:
                     "cached_at": datetime.utcnow().isoformat()
                 }
         
-        # 5. Process new request
+        # 5. Join an identical query already in flight, if any; like a cache
+        # hit, this counts towards cache_hits rather than requests
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            # Shielded so a cancelled follower doesn't cancel the shared call
+            response = await asyncio.shield(task)
+            self._cache_hits[self._usage_row(tenant_id)] += 1
+            return {
+                **response,
+                "from_cache": True,
+                "cached_at": datetime.utcnow().isoformat()
+            }
+        
+        # 6. Process new request
         try:
             # This would call the actual RAG engine or model
-            response = await self._process_query(
-                tenant_id, query, query_type, config
+            task = asyncio.create_task(
+                self._process_query(tenant_id, query, query_type, config)
             )
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+            response = await asyncio.shield(task)
             
             # Track usage
             self.track_usage(
@@ -347,7 +470,7 @@ class TenantRouter:
             
             # Cache response
             if config["cache_enabled"]:
-                self.cache_response(tenant_id, query, query_type, response)
+                self.cache_response(tenant_id, query, query_type, response, cache_key)
             
             return {
                 **response,
@@ -357,9 +480,165 @@ class TenantRouter:
         except Exception as e:
             # Track error
             self.track_usage(tenant_id, 0, query_type, False)
-            logger.error(f"[{tenant_id}] Query failed: {e}")
+            logger.error("[%s] Query failed: %s", tenant_id, e)
             raise
     
+    async def _get_engine(self, tenant_id: str, config: Dict[str, Any]) -> "SecureRAGEngine":
+        """
+        Get the RAG engine for a tenant, building it on first use.
+        
+        A per-tenant lock ensures concurrent first requests build only one
+        engine. Past max_engines, the least recently used engine is dropped
+        and closed in the background once its query lock is free; callers
+        that query the engine must hold that lock (see _run_engine_query).
+        
+        Args:
+            tenant_id: Tenant identifier
+            config: Tenant configuration
+            
+        Returns:
+            SecureRAGEngine for the tenant
+        """
+        engine = self._engines.get(tenant_id)
+        if engine is not None:
+            self._engines.move_to_end(tenant_id)
+            return engine
+        
+        async with self._engine_locks[tenant_id]:
+            # Another request may have built it while we waited
+            engine = self._engines.get(tenant_id)
+            if engine is not None:
+                self._engines.move_to_end(tenant_id)
+                return engine
+            
+            # Import RAG engine (lazy import to avoid circular dependencies)
+            import sys
+            sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+            
+            from rag.secure_rag_engine import SecureRAGEngine, TenantDatabaseConfig
+            
+            # Load tenant-specific database configuration
+            tenant_config = TenantDatabaseConfig(
+                tenant_id=tenant_id,
+                sales_connection_string=config["database_connections"]["sales_db"],
+                anonymized_patient_connection_string=config["database_connections"]["patient_db"],
+                inventory_connection_string=config["database_connections"]["inventory_db"]
+            )
+            
+            # Opens DB pools and loads the model, so keep it off the event loop
+            engine = await asyncio.to_thread(
+                SecureRAGEngine,
+                tenant_config=tenant_config,
+                model_path=os.getenv("MODEL_PATH", "~/.cache/llama-models/Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf")
+            )
+            self._engines[tenant_id] = engine
+            
+            while len(self._engines) > self.max_engines:
+                evicted_id, evicted = self._engines.popitem(last=False)
+                logger.info("[%s] Closing least recently used RAG engine", evicted_id)
+                task = asyncio.create_task(self._close_engine(evicted_id, evicted))
+                self._closing_engines.add(task)
+                task.add_done_callback(self._closing_engines.discard)
+            
+            return engine
+    
+    async def _close_engine(self, tenant_id: str, engine: "SecureRAGEngine"):
+        """Close an evicted engine once any query still running on it is done."""
+        async with self._engine_query_locks[tenant_id]:
+            try:
+                # Disposes DB pools and frees the model, so keep it off the event loop
+                await asyncio.to_thread(engine.close)
+            except Exception as e:
+                logger.error("[%s] Failed to close RAG engine: %s", tenant_id, e)
+    
+    async def _run_engine_query(
+        self,
+        tenant_id: str,
+        config: Dict[str, Any],
+        method: str,
+        query: str
+    ) -> Dict[str, Any]:
+        """
+        Run a blocking engine query on the query pool, one at a time per engine.
+        
+        An engine's Llama instance, query engines and DB connections aren't
+        safe to use from several threads at once, so concurrent queries for
+        the same tenant wait for each other while different tenants still
+        run in parallel. The llama_index Settings engines share are only
+        assigned during engine construction, always to equivalent values.
+        
+        The engine is looked up while holding the lock, so an eviction can't
+        close it until the query has finished.
+        """
+        async with self._engine_query_locks[tenant_id]:
+            rag_engine = await self._get_engine(tenant_id, config)
+            loop = asyncio.get_running_loop()
+            if self._query_pool is None:
+                self._query_pool = ThreadPoolExecutor(
+                    max_workers=self.query_workers,
+                    thread_name_prefix="rag-query",
+                )
+            return await loop.run_in_executor(self._query_pool, getattr(rag_engine, method), query)
+    
+    def _bucket_expired(self, bucket: int, now: float) -> bool:
+        """Whether every entry in a TTL bucket is past cache_ttl."""
+        # A bucket's newest entry was stored before (bucket + 1) * width
+        return (bucket + 1) * self.cache_sweep_interval + self.cache_ttl <= now
+    
+    def _sweep_expired(self):
+        """Drop cache entries from every bucket old enough to have expired."""
+        now = time.monotonic()
+        
+        expired = [bucket for bucket in self._ttl_buckets if self._bucket_expired(bucket, now)]
+        for bucket in expired:
+            for cache_key in self._ttl_buckets.pop(bucket):
+                # Skip keys already evicted or re-cached since
+                cached = self.request_cache.get(cache_key)
+                if cached is not None and now - cached["timestamp"] >= self.cache_ttl:
+                    del self.request_cache[cache_key]
+    
+    async def _sweep_cache(self):
+        while True:
+            await asyncio.sleep(self.cache_sweep_interval)
+            self._sweep_expired()
+    
+    def start(self):
+        """Start the usage and cache expiry workers (requires a running event loop)."""
+        if self._usage_worker is None:
+            # A fresh queue per run; one from a previous event loop can't be reused
+            self._usage_queue = asyncio.Queue()
+            self._usage_worker = asyncio.create_task(self._drain_usage())
+        if self._cache_sweeper is None:
+            self._cache_sweeper = asyncio.create_task(self._sweep_cache())
+    
+    async def close(self):
+        """Stop the background workers, then close cached RAG engines and the query pool."""
+        for worker in (self._usage_worker, self._cache_sweeper):
+            if worker is not None:
+                worker.cancel()
+                try:
+                    await worker
+                except asyncio.CancelledError:
+                    pass
+        self._usage_worker = None
+        self._cache_sweeper = None
+        
+        # Write out anything the worker didn't get to
+        pending = []
+        while not self._usage_queue.empty():
+            pending.append(self._usage_queue.get_nowait())
+        if pending:
+            self._flush_usage(pending)
+        
+        if self._query_pool is not None:
+            self._query_pool.shutdown(wait=True)
+            self._query_pool = None
+        if self._closing_engines:
+            await asyncio.gather(*self._closing_engines)
+        while self._engines:
+            tenant_id, engine = self._engines.popitem(last=False)
+            await self._close_engine(tenant_id, engine)
+    
     async def _process_query(
         self,
         tenant_id: str,
@@ -379,35 +658,14 @@ class TenantRouter:
         Returns:
             Query response
         """
-        # Import RAG engine (lazy import to avoid circular dependencies)
-        import sys
-        import os
-        sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-
-        from rag.secure_rag_engine import SecureRAGEngine, TenantDatabaseConfig
-
         try:
-            # Load tenant-specific database configuration
-            tenant_config = TenantDatabaseConfig(
-                tenant_id=tenant_id,
-                sales_connection_string=config["database_connections"]["sales_db"],
-                anonymized_patient_connection_string=config["database_connections"]["patient_db"],
-                inventory_connection_string=config["database_connections"]["inventory_db"]
-            )
-
-            # Initialize RAG engine for this tenant
-            rag_engine = SecureRAGEngine(
-                tenant_config=tenant_config,
-                model_path=os.getenv("MODEL_PATH", "~/.cache/llama-models/Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf")
-            )
-
-            # Route to appropriate query method
+            # Route to appropriate query method on this tenant's RAG engine
             if query_type == "sales":
-                result = rag_engine.query_sales(query)
+                result = await self._run_engine_query(tenant_id, config, "query_sales", query)
             elif query_type == "inventory":
-                result = rag_engine.query_inventory(query)
+                result = await self._run_engine_query(tenant_id, config, "query_inventory", query)
             elif query_type == "patient_analytics":
-                result = rag_engine.query_patient_analytics(query)
+                result = await self._run_engine_query(tenant_id, config, "query_patient_analytics", query)
             elif query_type == "ophthalmic_knowledge":
                 # For knowledge queries, use the fine-tuned model directly
                 result = {
@@ -418,9 +676,6 @@ class TenantRouter:
             else:
                 raise ValueError(f"Unknown query type: {query_type}")
 
-            # Clean up
-            rag_engine.close()
-
             # Add tenant context and token estimation
             return {
                 "answer": result.get("answer", "No answer generated"),
@@ -433,7 +688,7 @@ class TenantRouter:
             }
 
         except Exception as e:
-            logger.error(f"[{tenant_id}] RAG query failed: {e}")
+            logger.error("[%s] RAG query failed: %s", tenant_id, e)
             # Fallback to informative error message
             return {
                 "answer": f"I apologize, but I encountered an error processing your query. Please ensure the database connections are properly configured. Error: {str(e)}",
@@ -6,11 +6,16 @@ Production-ready FastAPI application with OpenAI/Anthropic integration and RAG
 from fastapi import FastAPI, Depends, HTTPException, status, Security, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from typing import Optional, List, Dict, Any, Literal, Tuple
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import hashlib
+import time
 import jwt
 import uuid
 
@@ -32,14 +37,12 @@ security = HTTPBearer()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager with graceful startup."""
-    import asyncio
-
     # Startup
     logger.info("Starting ILS 2.0 AI Service...")
-    logger.info(f"Environment: {settings.environment}")
-    logger.info(f"Primary LLM Provider: {settings.primary_llm_provider}")
-    logger.info(f"Database configured: {bool(settings.database_url)}")
-    logger.info(f"OpenAI configured: {bool(settings.openai_api_key)}")
+    logger.info("Environment: {}", settings.environment)
+    logger.info("Primary LLM Provider: {}", settings.primary_llm_provider)
+    logger.info("Database configured: {}", bool(settings.database_url))
+    logger.info("OpenAI configured: {}", bool(settings.openai_api_key))
 
     # Initialize database with timeout - don't block startup
     try:
@@ -48,7 +51,7 @@ async def lifespan(app: FastAPI):
     except asyncio.TimeoutError:
         logger.warning("Database initialization timed out - service will start in degraded mode")
     except Exception as e:
-        logger.warning(f"Database initialization failed - service will start in degraded mode: {e}")
+        logger.warning("Database initialization failed - service will start in degraded mode: {}", e)
 
     logger.info("AI Service started successfully (may be in degraded mode)")
 
@@ -67,6 +70,7 @@ app = FastAPI(
     version=settings.app_version,
     description="Production AI service for ophthalmic and dispensing domain with RAG",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS
@@ -83,8 +87,15 @@ app.add_middleware(
 # Request/Response Models
 # ================================
 
-class TokenPayload(BaseModel):
-    """JWT token payload."""
+@dataclass(frozen=True, slots=True)
+class TokenPayload:
+    """
+    JWT token payload.
+
+    Only ever built in-process from an already verified token, so it skips
+    pydantic validation. Frozen because instances are shared through the
+    verified-token cache.
+    """
     tenant_id: str
     user_id: str
     company_id: str
@@ -158,13 +169,48 @@ class FeedbackRequest(BaseModel):
     comments: Optional[str] = None
 
 
+class BatchItem(BaseModel):
+    """One operation within a batch request."""
+    id: str = Field(..., min_length=1)
+    operation: Literal["chat", "product_recommendation", "business_query", "feedback"]
+    body: Dict[str, Any]
+
+
+class BatchRequest(BaseModel):
+    """Batch of operations run with a single authentication."""
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=20)
+
+
 # ================================
 # Authentication
 # ================================
 
-def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> TokenPayload:
-    """Verify JWT token and extract payload."""
+# Recently verified tokens: token digest -> (payload, unix time to re-verify by).
+# Entries are re-verified at least every _JWT_CACHE_TTL seconds and never
+# outlive the token's own exp.
+_JWT_CACHE_MAX = 4096
+_JWT_CACHE_TTL = 300
+_jwt_cache: "OrderedDict[bytes, Tuple[TokenPayload, float]]" = OrderedDict()
+
+
+async def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Security(security)) -> TokenPayload:
+    """
+    Verify JWT token and extract payload.
+
+    Async so it runs inline on the event loop: an HS256 decode is cheaper
+    than the thread pool hop a sync dependency costs, and the token cache
+    needs no lock.
+    """
     token = credentials.credentials
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+
+    cached = _jwt_cache.get(cache_key)
+    if cached is not None:
+        if now < cached[1]:
+            _jwt_cache.move_to_end(cache_key)
+            return cached[0]
+        del _jwt_cache[cache_key]
 
     try:
         payload = jwt.decode(
@@ -184,21 +230,30 @@ def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Security(securi
             )
 
         exp = payload.get("exp")
-        if exp and datetime.fromtimestamp(exp) < datetime.utcnow():
+        if exp and exp < now:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token expired",
             )
 
-        return TokenPayload(
+        token_payload = TokenPayload(
             tenant_id=tenant_id,
             user_id=user_id,
             company_id=company_id,
             exp=datetime.fromtimestamp(exp) if exp else datetime.utcnow() + timedelta(hours=1)
         )
 
+        expires = now + _JWT_CACHE_TTL
+        if exp:
+            expires = min(expires, exp - 5)
+        _jwt_cache[cache_key] = (token_payload, expires)
+        if len(_jwt_cache) > _JWT_CACHE_MAX:
+            _jwt_cache.popitem(last=False)
+
+        return token_payload
+
     except jwt.PyJWTError as e:
-        logger.warning(f"JWT verification failed: {e}")
+        logger.warning("JWT verification failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -220,13 +275,13 @@ async def health_check():
         # Check database with timeout (default 5s)
         db_healthy = await check_db_health(timeout=3.0)
     except Exception as e:
-        logger.warning(f"Database health check exception: {e}")
+        logger.warning("Database health check exception: {}", e)
         db_healthy = False
 
     try:
         llm_available = llm_service.is_available()
     except Exception as e:
-        logger.warning(f"LLM availability check exception: {e}")
+        logger.warning("LLM availability check exception: {}", e)
         llm_available = False
 
     # Service status - degraded is still operational
@@ -257,7 +312,7 @@ async def chat(
     - Product recommendations
     """
     try:
-        logger.info(f"Chat request from company {token.company_id}: {request.message[:100]}")
+        logger.info("Chat request from company {}: {}", token.company_id, request.message[:100])
 
         response = await ophthalmic_ai_service.chat(
             message=request.message,
@@ -279,7 +334,7 @@ async def chat(
                     confidence=response["confidence"],
                 )
             except Exception as e:
-                logger.error(f"Failed to save learned data: {e}")
+                logger.error("Failed to save learned data: {}", e)
 
         return ChatResponse(
             conversation_id=request.conversation_id,
@@ -287,7 +342,7 @@ async def chat(
         )
 
     except Exception as e:
-        logger.error(f"Chat failed: {e}")
+        logger.error("Chat failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Chat processing failed",
@@ -318,7 +373,7 @@ async def add_knowledge(
         }
 
     except Exception as e:
-        logger.error(f"Add knowledge failed: {e}")
+        logger.error("Add knowledge failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to add knowledge",
@@ -344,7 +399,7 @@ async def get_product_recommendation(
         }
 
     except Exception as e:
-        logger.error(f"Product recommendation failed: {e}")
+        logger.error("Product recommendation failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate recommendation",
@@ -370,7 +425,7 @@ async def business_query(
         }
 
     except Exception as e:
-        logger.error(f"Business query failed: {e}")
+        logger.error("Business query failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to process business query",
@@ -397,7 +452,7 @@ async def submit_feedback(
         }
 
     except Exception as e:
-        logger.error(f"Feedback submission failed: {e}")
+        logger.error("Feedback submission failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to record feedback",
@@ -416,7 +471,7 @@ async def get_learning_progress(token: TokenPayload = Depends(verify_jwt_token))
         }
 
     except Exception as e:
-        logger.error(f"Get learning progress failed: {e}")
+        logger.error("Get learning progress failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get learning progress",
@@ -440,13 +495,71 @@ async def system_health(token: TokenPayload = Depends(verify_jwt_token)):
         }
 
     except Exception as e:
-        logger.error(f"System health check failed: {e}")
+        logger.error("System health check failed: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to check system health",
         )
 
 
+# operation -> (request model, endpoint handler)
+_BATCH_OPERATIONS = {
+    "chat": (ChatRequest, chat),
+    "product_recommendation": (ProductRecommendationRequest, get_product_recommendation),
+    "business_query": (BusinessQueryRequest, business_query),
+    "feedback": (FeedbackRequest, submit_feedback),
+}
+
+
+async def _run_batch_item(item: BatchItem, token: TokenPayload) -> Dict[str, Any]:
+    """Run one batch operation through its endpoint handler."""
+    model, handler = _BATCH_OPERATIONS[item.operation]
+
+    try:
+        result = await handler(request=model(**item.body), token=token)
+    except ValidationError as e:
+        detail = e.errors(include_url=False, include_context=False)
+        return {"id": item.id, "status": status.HTTP_422_UNPROCESSABLE_ENTITY, "body": {"detail": detail}}
+    except HTTPException as e:
+        return {"id": item.id, "status": e.status_code, "body": {"detail": e.detail}}
+
+    if isinstance(result, BaseModel):
+        result = result.model_dump()
+    return {"id": item.id, "status": status.HTTP_200_OK, "body": result}
+
+
+@app.post("/api/v1/batch")
+async def batch(
+    request: BatchRequest,
+    token: TokenPayload = Depends(verify_jwt_token),
+):
+    """
+    Run several chat, recommendation, business query or feedback
+    operations in one request.
+
+    The token is verified once for the whole batch and operations run
+    concurrently. Each result carries the status code the matching
+    endpoint would have returned.
+    """
+    results = await asyncio.gather(
+        *(_run_batch_item(item, token) for item in request.requests),
+        return_exceptions=True,
+    )
+
+    return {
+        "success": True,
+        "results": [
+            {
+                "id": item.id,
+                "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "body": {"detail": "Operation failed"},
+            }
+            if isinstance(result, Exception) else result
+            for item, result in zip(request.requests, results)
+        ],
+    }
+
+
 # ================================
 # Admin Endpoints (for testing)
 # ================================
@@ -487,9 +600,9 @@ async def generate_test_token(company_id: str, user_id: str):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
-    logger.error(f"Unhandled exception: {exc}")
+    logger.error("Unhandled exception: {}", exc)
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
@@ -79,7 +79,7 @@ class SecureRAGEngine:
         self.tenant_id = tenant_config.tenant_id
         self.config = tenant_config
         
-        logger.info(f"Initializing RAG engine for tenant: {self.tenant_id}")
+        logger.info("Initializing RAG engine for tenant: %s", self.tenant_id)
         
         # Initialize LLM
         self._init_llm(model_path)
@@ -93,7 +93,7 @@ class SecureRAGEngine:
         # Initialize Query Engines
         self._init_query_engines()
         
-        logger.info(f"RAG engine initialized for tenant: {self.tenant_id}")
+        logger.info("RAG engine initialized for tenant: %s", self.tenant_id)
     
     def _init_llm(self, model_path: str):
         """Initialize the language model."""
@@ -114,7 +114,7 @@ class SecureRAGEngine:
             
             logger.info("LLM initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize LLM: {e}")
+            logger.error("Failed to initialize LLM: %s", e)
             raise
     
     def _init_embeddings(self, model_name: str):
@@ -124,9 +124,9 @@ class SecureRAGEngine:
                 model_name=model_name,
                 trust_remote_code=True,
             )
-            logger.info(f"Embedding model initialized: {model_name}")
+            logger.info("Embedding model initialized: %s", model_name)
         except Exception as e:
-            logger.error(f"Failed to initialize embeddings: {e}")
+            logger.error("Failed to initialize embeddings: %s", e)
             raise
     
     def _init_databases(self):
@@ -167,7 +167,7 @@ class SecureRAGEngine:
             
             logger.info("Database connections established (read-only)")
         except Exception as e:
-            logger.error(f"Failed to initialize databases: {e}")
+            logger.error("Failed to initialize databases: %s", e)
             raise
     
     def _init_query_engines(self):
@@ -196,7 +196,7 @@ class SecureRAGEngine:
             
             logger.info("Query engines initialized")
         except Exception as e:
-            logger.error(f"Failed to initialize query engines: {e}")
+            logger.error("Failed to initialize query engines: %s", e)
             raise
     
     def query_sales(self, question: str) -> Dict[str, Any]:
@@ -209,7 +209,7 @@ class SecureRAGEngine:
         Returns:
             Dictionary with answer and metadata
         """
-        logger.info(f"[{self.tenant_id}] Sales query: {question}")
+        logger.info("[%s] Sales query: %s", self.tenant_id, question)
         
         try:
             response = self.sales_query_engine.query(question)
@@ -224,11 +224,11 @@ class SecureRAGEngine:
                 "success": True,
             }
             
-            logger.info(f"[{self.tenant_id}] Sales query successful")
+            logger.info("[%s] Sales query successful", self.tenant_id)
             return result
             
         except Exception as e:
-            logger.error(f"[{self.tenant_id}] Sales query failed: {e}")
+            logger.error("[%s] Sales query failed: %s", self.tenant_id, e)
             return {
                 "answer": "I apologize, but I encountered an error processing your query.",
                 "error": str(e),
@@ -245,7 +245,7 @@ class SecureRAGEngine:
         Returns:
             Dictionary with answer and metadata
         """
-        logger.info(f"[{self.tenant_id}] Inventory query: {question}")
+        logger.info("[%s] Inventory query: %s", self.tenant_id, question)
         
         try:
             response = self.inventory_query_engine.query(question)
@@ -260,11 +260,11 @@ class SecureRAGEngine:
                 "success": True,
             }
             
-            logger.info(f"[{self.tenant_id}] Inventory query successful")
+            logger.info("[%s] Inventory query successful", self.tenant_id)
             return result
             
         except Exception as e:
-            logger.error(f"[{self.tenant_id}] Inventory query failed: {e}")
+            logger.error("[%s] Inventory query failed: %s", self.tenant_id, e)
             return {
                 "answer": "I apologize, but I encountered an error processing your query.",
                 "error": str(e),
@@ -284,11 +284,11 @@ class SecureRAGEngine:
         Returns:
             Dictionary with answer and metadata
         """
-        logger.info(f"[{self.tenant_id}] Patient analytics query: {question}")
+        logger.info("[%s] Patient analytics query: %s", self.tenant_id, question)
         
         # Validate query doesn't attempt to access PII
         if self._contains_pii_terms(question):
-            logger.warning(f"[{self.tenant_id}] Query rejected: Contains PII terms")
+            logger.warning("[%s] Query rejected: Contains PII terms", self.tenant_id)
             return {
                 "answer": "I cannot provide information about specific individuals. I can only provide anonymized aggregate statistics and trends.",
                 "error": "PII_REJECTED",
@@ -309,11 +309,11 @@ class SecureRAGEngine:
                 "success": True,
             }
             
-            logger.info(f"[{self.tenant_id}] Patient analytics query successful")
+            logger.info("[%s] Patient analytics query successful", self.tenant_id)
             return result
             
         except Exception as e:
-            logger.error(f"[{self.tenant_id}] Patient analytics query failed: {e}")
+            logger.error("[%s] Patient analytics query failed: %s", self.tenant_id, e)
             return {
                 "answer": "I apologize, but I encountered an error processing your query.",
                 "error": str(e),
@@ -343,9 +343,9 @@ class SecureRAGEngine:
             self.sales_engine.dispose()
             self.patient_engine.dispose()
             self.inventory_engine.dispose()
-            logger.info(f"[{self.tenant_id}] Database connections closed")
+            logger.info("[%s] Database connections closed", self.tenant_id)
         except Exception as e:
-            logger.error(f"[{self.tenant_id}] Error closing connections: {e}")
+            logger.error("[%s] Error closing connections: %s", self.tenant_id, e)
 
 
 # Example Usage
@@ -43,7 +43,7 @@ def _get_engine():
             )
             _db_available = True
         except Exception as e:
-            logger.error(f"Failed to create database engine: {e}")
+            logger.error("Failed to create database engine: {}", e)
             _db_available = False
             return None
     return _engine
@@ -198,7 +198,7 @@ async def init_db():
 
         logger.info("Database initialized successfully")
     except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
+        logger.error("Failed to initialize database: {}", e)
         # Don't raise - allow service to start in degraded mode
 
 
@@ -248,8 +248,8 @@ async def check_db_health(timeout: float = 5.0) -> bool:
 
         return await asyncio.wait_for(_check(), timeout=timeout)
     except asyncio.TimeoutError:
-        logger.warning(f"Database health check timed out after {timeout}s")
+        logger.warning("Database health check timed out after {}s", timeout)
         return False
     except Exception as e:
-        logger.error(f"Database health check failed: {e}")
+        logger.error("Database health check failed: {}", e)
         return False
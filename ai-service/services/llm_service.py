@@ -28,7 +28,7 @@ class LLMService:
                 self.openai_client = AsyncOpenAI(api_key=settings.openai_api_key)
                 self._openai_available = True
             except Exception as e:
-                logger.warning(f"Failed to initialize OpenAI client: {e}")
+                logger.warning("Failed to initialize OpenAI client: {}", e)
         else:
             logger.warning("OPENAI_API_KEY not configured. OpenAI features unavailable.")
 
@@ -37,7 +37,7 @@ class LLMService:
                 self.anthropic_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
                 self._anthropic_available = True
             except Exception as e:
-                logger.warning(f"Failed to initialize Anthropic client: {e}")
+                logger.warning("Failed to initialize Anthropic client: {}", e)
 
         self.primary_provider = settings.primary_llm_provider
         self.fallback_provider = settings.fallback_llm_provider
@@ -75,7 +75,7 @@ class LLMService:
             elif self.primary_provider == "anthropic":
                 return await self._generate_anthropic(messages, temperature, max_tokens, system_prompt)
         except Exception as e:
-            logger.warning(f"Primary LLM provider ({self.primary_provider}) failed: {e}")
+            logger.warning("Primary LLM provider ({}) failed: {}", self.primary_provider, e)
 
             # Try fallback provider
             try:
@@ -85,7 +85,7 @@ class LLMService:
                     if self.anthropic_client:
                         return await self._generate_anthropic(messages, temperature, max_tokens, system_prompt)
             except Exception as fallback_error:
-                logger.error(f"Fallback LLM provider ({self.fallback_provider}) also failed: {fallback_error}")
+                logger.error("Fallback LLM provider ({}) also failed: {}", self.fallback_provider, fallback_error)
 
         raise Exception("All LLM providers failed")
 
@@ -179,7 +179,7 @@ class LLMService:
             return [item.embedding for item in response.data]
 
         except Exception as e:
-            logger.error(f"Failed to generate embeddings: {e}")
+            logger.error("Failed to generate embeddings: {}", e)
             raise
 
     async def check_health(self) -> Dict[str, Any]:
@@ -198,7 +198,7 @@ class LLMService:
                 await self.openai_client.models.list()
                 health["openai"] = True
             except Exception as e:
-                logger.error(f"OpenAI health check failed: {e}")
+                logger.error("OpenAI health check failed: {}", e)
 
         # Check Anthropic
         if self.anthropic_client and self._anthropic_available:
@@ -211,7 +211,7 @@ class LLMService:
                 )
                 health["anthropic"] = True
             except Exception as e:
-                logger.error(f"Anthropic health check failed: {e}")
+                logger.error("Anthropic health check failed: {}", e)
 
         return health
 
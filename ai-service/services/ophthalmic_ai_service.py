@@ -111,7 +111,7 @@ class OphthalmicAIService:
                 # If we have highly relevant learned data, use it directly
                 if learned_items and learned_items[0]["similarity"] > 0.9:
                     best_match = learned_items[0]
-                    logger.info(f"Using learned answer (similarity: {best_match['similarity']})")
+                    logger.info("Using learned answer (similarity: {})", best_match['similarity'])
 
                     return {
                         "answer": best_match["answer"],
@@ -173,7 +173,7 @@ class OphthalmicAIService:
             }
 
         except Exception as e:
-            logger.error(f"Chat processing failed: {e}")
+            logger.error("Chat processing failed: {}", e)
             raise
 
     def _build_context_string(self, context_items: List[Dict[str, Any]]) -> str:
@@ -244,7 +244,7 @@ class OphthalmicAIService:
             }
 
         except Exception as e:
-            logger.error(f"Product recommendation failed: {e}")
+            logger.error("Product recommendation failed: {}", e)
             raise
 
     async def analyze_business_query(
@@ -281,7 +281,7 @@ class OphthalmicAIService:
             }
 
         except Exception as e:
-            logger.error(f"Business query analysis failed: {e}")
+            logger.error("Business query analysis failed: {}", e)
             raise
 
 
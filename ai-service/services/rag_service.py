@@ -88,11 +88,11 @@ class RAGService:
                             "source": kb_entry.filename or "manual",
                         })
 
-                logger.info(f"Found {len(knowledge_items)} relevant knowledge items for query")
+                logger.info("Found {} relevant knowledge items for query", len(knowledge_items))
                 return knowledge_items
 
         except Exception as e:
-            logger.error(f"Knowledge search failed: {e}")
+            logger.error("Knowledge search failed: {}", e)
             return []
 
     async def search_learned_data(
@@ -163,11 +163,11 @@ class RAGService:
                             "use_count": learning_entry.useCount,
                         })
 
-                logger.info(f"Found {len(learned_items)} relevant learned items for query")
+                logger.info("Found {} relevant learned items for query", len(learned_items))
                 return learned_items
 
         except Exception as e:
-            logger.error(f"Learned data search failed: {e}")
+            logger.error("Learned data search failed: {}", e)
             return []
 
     async def add_knowledge(
@@ -219,7 +219,7 @@ class RAGService:
                 await session.commit()
                 await session.refresh(kb_entry)
 
-                logger.info(f"Added knowledge entry {kb_entry.id} for company {company_id}")
+                logger.info("Added knowledge entry {} for company {}", kb_entry.id, company_id)
 
                 return {
                     "id": str(kb_entry.id),
@@ -229,7 +229,7 @@ class RAGService:
                 }
 
         except Exception as e:
-            logger.error(f"Failed to add knowledge: {e}")
+            logger.error("Failed to add knowledge: {}", e)
             raise
 
     async def add_learned_data(
@@ -285,7 +285,7 @@ class RAGService:
                 await session.commit()
                 await session.refresh(learning_entry)
 
-                logger.info(f"Added learning data {learning_entry.id} for company {company_id}")
+                logger.info("Added learning data {} for company {}", learning_entry.id, company_id)
 
                 return {
                     "id": str(learning_entry.id),
@@ -295,7 +295,7 @@ class RAGService:
                 }
 
         except Exception as e:
-            logger.error(f"Failed to add learned data: {e}")
+            logger.error("Failed to add learned data: {}", e)
             raise
 
     async def update_learning_metrics(
@@ -337,10 +337,10 @@ class RAGService:
                         learning_entry.successRate = int(new_success_rate)
 
                     await session.commit()
-                    logger.info(f"Updated learning metrics for {learning_id}")
+                    logger.info("Updated learning metrics for {}", learning_id)
 
         except Exception as e:
-            logger.error(f"Failed to update learning metrics: {e}")
+            logger.error("Failed to update learning metrics: {}", e)
 
     async def get_company_learning_progress(self, company_id: str) -> Dict[str, Any]:
         """
@@ -396,7 +396,7 @@ class RAGService:
                 }
 
         except Exception as e:
-            logger.error(f"Failed to get learning progress: {e}")
+            logger.error("Failed to get learning progress: {}", e)
             return {
                 "total_progress": 0,
                 "knowledge_base_entries": 0,
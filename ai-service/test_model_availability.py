@@ -11,9 +11,13 @@ This script verifies that:
 import os
 import sys
 import json
+import asyncio
+import aiohttp
 import requests
 from pathlib import Path
 
+MODEL_PATH = os.path.expanduser("~/.cache/llama-models/Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf")
+
 
 def test_gguf_model_file():
     """Test if GGUF model file exists and is accessible."""
@@ -21,15 +25,13 @@ def test_gguf_model_file():
     print("1. Testing GGUF Model File Availability")
     print("="*60)
     
-    model_path = Path.home() / ".cache" / "llama-models" / "Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf"
-    
-    if model_path.exists():
-        size_gb = model_path.stat().st_size / (1024**3)
-        print(f"✅ Model file found: {model_path}")
+    if os.path.exists(MODEL_PATH):
+        size_gb = os.path.getsize(MODEL_PATH) / (1024**3)
+        print(f"✅ Model file found: {MODEL_PATH}")
         print(f"   Size: {size_gb:.2f} GB")
         return True
     else:
-        print(f"❌ Model file not found at: {model_path}")
+        print(f"❌ Model file not found at: {MODEL_PATH}")
         return False
 
 
@@ -58,54 +60,67 @@ def test_model_server():
         return False
 
 
-def test_model_inference():
-    """Test model inference capability."""
+TEST_PROMPTS = [
+    "What is the difference between single vision and progressive lenses?",
+    "What lens material would you recommend for high prescriptions?",
+    "How do anti-reflective coatings work?",
+]
+
+
+async def _ask_model(session: aiohttp.ClientSession, prompt: str) -> dict:
+    """Send one chat completion request to the model server."""
+    async with session.post(
+        "http://localhost:8000/v1/chat/completions",
+        json={
+            "model": "gpt-3.5-turbo",  # API compatibility
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert in optical dispensing and ophthalmic care."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": 200,
+            "temperature": 0.7
+        },
+    ) as response:
+        if response.status != 200:
+            raise RuntimeError(f"status code {response.status}: {await response.text()}")
+        return await response.json()
+
+
+async def test_model_inference():
+    """Test model inference capability (prompts are sent concurrently)."""
     print("\n" + "="*60)
     print("3. Testing Model Inference")
     print("="*60)
     
-    test_prompt = "What is the difference between single vision and progressive lenses?"
+    print(f"Sending {len(TEST_PROMPTS)} prompts concurrently...")
     
-    print(f"Prompt: {test_prompt}")
-    print("Generating response...")
-    
-    try:
-        response = requests.post(
-            "http://localhost:8000/v1/chat/completions",
-            headers={"Content-Type": "application/json"},
-            json={
-                "model": "gpt-3.5-turbo",  # API compatibility
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert in optical dispensing and ophthalmic care."
-                    },
-                    {
-                        "role": "user",
-                        "content": test_prompt
-                    }
-                ],
-                "max_tokens": 200,
-                "temperature": 0.7
-            },
-            timeout=30
+    connector = aiohttp.TCPConnector(limit=len(TEST_PROMPTS))
+    timeout = aiohttp.ClientTimeout(total=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        results = await asyncio.gather(
+            *(_ask_model(session, prompt) for prompt in TEST_PROMPTS),
+            return_exceptions=True,
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            answer = result['choices'][0]['message']['content']
-            print(f"\n✅ Model Response:")
-            print(f"   {answer}")
-            print(f"\n   Tokens used: {result.get('usage', {})}")
-            return True
-        else:
-            print(f"❌ Inference failed with status code: {response.status_code}")
-            print(f"   Response: {response.text}")
-            return False
-            
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Inference request failed: {e}")
-        return False
+    
+    all_ok = True
+    for prompt, result in zip(TEST_PROMPTS, results):
+        print(f"\nPrompt: {prompt}")
+        if isinstance(result, Exception):
+            print(f"❌ Inference request failed: {result}")
+            all_ok = False
+            continue
+        answer = result['choices'][0]['message']['content']
+        print(f"✅ Model Response:")
+        print(f"   {answer}")
+        print(f"   Tokens used: {result.get('usage', {})}")
+    
+    return all_ok
 
 
 def test_training_data():
@@ -176,7 +191,7 @@ def main():
     results = {
         "GGUF Model File": test_gguf_model_file(),
         "Model Server": test_model_server(),
-        "Model Inference": test_model_inference(),
+        "Model Inference": asyncio.run(test_model_inference()),
         "Training Data": test_training_data(),
         "HuggingFace Access": check_huggingface_access(),
     }
@@ -0,0 +1,98 @@
+"""
+api.main JWT verification cache tests.
+"""
+
+import importlib
+import sys
+import time
+import types
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+
+@pytest.fixture
+def main(monkeypatch):
+    """api.main, importable without llama_index; token cache cleared."""
+    try:
+        importlib.import_module("rag.secure_rag_engine")
+    except ImportError:
+        class FakeEngine:
+            def query_sales(self, question): ...
+            def query_inventory(self, question): ...
+            def query_patient_analytics(self, question): ...
+
+        fake_module = types.ModuleType("rag.secure_rag_engine")
+        fake_module.SecureRAGEngine = FakeEngine
+        fake_module.TenantDatabaseConfig = object
+        monkeypatch.setitem(sys.modules, "rag.secure_rag_engine", fake_module)
+
+    module = importlib.import_module("api.main")
+    module._token_cache.clear()
+    yield module
+    module._token_cache.clear()
+
+
+@pytest.fixture
+def decodes(main, monkeypatch):
+    """Counts jwt.decode calls made by verify_jwt_token."""
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(main.jwt, "decode", counting_decode)
+    return calls
+
+
+def _credentials(main, secret=None, **claims):
+    claims.setdefault("tenant_id", "t1")
+    claims.setdefault("user_id", "u1")
+    settings = main.get_settings()
+    token = jwt.encode(claims, secret or settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_verified_token_is_served_from_cache(main, decodes):
+    credentials = _credentials(main, exp=int(time.time()) + 60)
+
+    first = main.verify_jwt_token(credentials)
+    second = main.verify_jwt_token(credentials)
+
+    assert (first.tenant_id, first.user_id) == ("t1", "u1")
+    assert second == first
+    assert len(decodes) == 1
+
+
+def test_cached_token_is_rejected_once_expired(main, decodes, monkeypatch):
+    exp = int(time.time()) + 60
+    credentials = _credentials(main, exp=exp)
+    main.verify_jwt_token(credentials)
+
+    monkeypatch.setattr(main.time, "time", lambda: exp + 1)
+    with pytest.raises(HTTPException) as raised:
+        main.verify_jwt_token(credentials)
+
+    assert raised.value.status_code == 401
+    assert raised.value.detail == "Token expired"
+    assert len(decodes) == 1
+
+
+@pytest.mark.parametrize("claims", [
+    {"secret": "a-different-secret-of-at-least-32-bytes"},
+    {"tenant_id": ""},
+])
+def test_rejected_token_is_not_cached(main, decodes, claims):
+    credentials = _credentials(main, **claims)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as raised:
+            main.verify_jwt_token(credentials)
+        assert raised.value.status_code == 401
+
+    assert len(decodes) == 2
+    assert len(main._token_cache) == 0
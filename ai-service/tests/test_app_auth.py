@@ -0,0 +1,109 @@
+"""
+app JWT verification cache tests.
+"""
+
+import asyncio
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import app as app_module
+
+SECRET = "test-secret-of-at-least-thirty-two-bytes"
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Counts jwt.decode calls made by verify_jwt_token; token cache cleared."""
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(app_module.settings, "jwt_secret", SECRET)
+    monkeypatch.setattr(app_module.jwt, "decode", counting_decode)
+    app_module._jwt_cache.clear()
+    yield calls
+    app_module._jwt_cache.clear()
+
+
+def _credentials(**claims):
+    claims.setdefault("tenant_id", "t1")
+    claims.setdefault("user_id", "u1")
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def _verify(credentials):
+    return asyncio.run(app_module.verify_jwt_token(credentials))
+
+
+def test_verified_token_is_served_from_cache(decodes):
+    credentials = _credentials(exp=int(time.time()) + 60)
+
+    first = _verify(credentials)
+    second = _verify(credentials)
+
+    assert (first.tenant_id, first.user_id) == ("t1", "u1")
+    assert second == first
+    assert len(decodes) == 1
+
+
+def test_cached_token_is_reverified_before_it_expires(decodes, monkeypatch):
+    exp = int(time.time()) + 60
+    credentials = _credentials(exp=exp)
+    _verify(credentials)
+
+    # Inside the last few seconds the cache is bypassed...
+    monkeypatch.setattr(app_module.time, "time", lambda: exp - 4)
+    _verify(credentials)
+    assert len(decodes) == 2
+
+    # ...so a hit can never outlive exp
+    monkeypatch.setattr(app_module.time, "time", lambda: exp + 1)
+    with pytest.raises(HTTPException) as raised:
+        _verify(credentials)
+    assert raised.value.status_code == 401
+    assert len(decodes) == 3
+
+
+def test_token_without_exp_is_reverified_after_cache_ttl(decodes, monkeypatch):
+    credentials = _credentials()
+    now = time.time()
+    _verify(credentials)
+
+    monkeypatch.setattr(app_module.time, "time", lambda: now + app_module._JWT_CACHE_TTL + 1)
+    _verify(credentials)
+
+    assert len(decodes) == 2
+
+
+def test_cache_drops_least_recently_used_token(decodes, monkeypatch):
+    monkeypatch.setattr(app_module, "_JWT_CACHE_MAX", 2)
+    a, b, c = (_credentials(user_id=user_id) for user_id in ("a", "b", "c"))
+
+    for credentials in (a, b, a, c):
+        _verify(credentials)
+    assert len(decodes) == 3
+
+    _verify(a)
+    assert len(decodes) == 3
+    _verify(b)
+    assert len(decodes) == 4
+
+
+def test_rejected_token_is_not_cached(decodes):
+    credentials = _credentials(tenant_id="")
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as raised:
+            _verify(credentials)
+        assert raised.value.status_code == 401
+
+    assert len(decodes) == 2
+    assert len(app_module._jwt_cache) == 0
@@ -0,0 +1,170 @@
+"""
+PromptBatcher tests against a stub /v1/completions server.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from api.batcher import ModelSlots, PromptBatcher
+
+
+class StubServer:
+    """Records request bodies and answers like an OpenAI completions server."""
+
+    def __init__(self, status: int = 200, reverse: bool = False):
+        self.status = status
+        self.reverse = reverse
+        self.bodies: List[Dict[str, Any]] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.bodies.append(body)
+        if self.status != 200:
+            return web.Response(status=self.status)
+
+        prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+        choices = [
+            {"index": i, "text": f" {prompt}/{body['max_tokens']} "}
+            for i, prompt in enumerate(prompts)
+        ]
+        if self.reverse:
+            choices.reverse()
+        return web.json_response({"choices": choices})
+
+
+async def _run(stub: StubServer, requests, **batcher_kwargs) -> List[Any]:
+    app = web.Application()
+    app.router.add_post("/v1/completions", stub.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            batcher = PromptBatcher(
+                session=session,
+                semaphore=ModelSlots(4),
+                url=f"http://127.0.0.1:{port}/v1/completions",
+                body={"temperature": 0.0},
+                max_wait=0.05,
+                **batcher_kwargs,
+            )
+            batcher.start()
+            try:
+                return await asyncio.gather(
+                    *(batcher.submit(prompt, max_tokens) for prompt, max_tokens in requests),
+                    return_exceptions=True,
+                )
+            finally:
+                await batcher.close()
+    finally:
+        await runner.cleanup()
+
+
+def test_multi_prompt_groups_by_max_tokens():
+    stub = StubServer()
+    results = asyncio.run(_run(
+        stub, [("a", 16), ("b", 32), ("c", 16)], multi_prompt=True,
+    ))
+
+    assert results == ["a/16", "b/32", "c/16"]
+    prompts_by_max_tokens = sorted(
+        (body["max_tokens"], body["prompt"]) for body in stub.bodies
+    )
+    assert prompts_by_max_tokens == [(16, ["a", "c"]), (32, "b")]
+
+
+def test_multi_prompt_maps_choices_by_index():
+    stub = StubServer(reverse=True)
+    results = asyncio.run(_run(
+        stub, [("a", 16), ("b", 16), ("c", 16)], multi_prompt=True,
+    ))
+
+    assert len(stub.bodies) == 1
+    assert results == ["a/16", "b/16", "c/16"]
+
+
+def test_single_prompt_mode_posts_each_prompt_as_a_string():
+    stub = StubServer()
+    results = asyncio.run(_run(stub, [("a", 16), ("b", 16)]))
+
+    assert results == ["a/16", "b/16"]
+    assert sorted(body["prompt"] for body in stub.bodies) == ["a", "b"]
+
+
+@pytest.mark.parametrize("multi_prompt", [False, True])
+def test_error_status_resolves_every_caller_with_none(multi_prompt):
+    stub = StubServer(status=500)
+    results = asyncio.run(_run(
+        stub, [("a", 16), ("b", 16)], multi_prompt=multi_prompt,
+    ))
+
+    assert results == [None, None]
+
+
+def test_connection_error_is_raised_to_every_caller():
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            batcher = PromptBatcher(
+                session=session,
+                semaphore=ModelSlots(1),
+                # Nothing listens on port 9 (discard) here
+                url="http://127.0.0.1:9/v1/completions",
+                body={},
+                max_wait=0.01,
+                multi_prompt=True,
+            )
+            batcher.start()
+            try:
+                return await asyncio.gather(
+                    batcher.submit("a", 16),
+                    batcher.submit("b", 16),
+                    return_exceptions=True,
+                )
+            finally:
+                await batcher.close()
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, aiohttp.ClientError) for result in results)
+
+
+def test_model_slots_track_in_flight_calls():
+    async def run():
+        slots = ModelSlots(2)
+        async with slots:
+            inside = (slots.in_flight, slots.available)
+        return inside, (slots.in_flight, slots.available)
+
+    assert asyncio.run(run()) == ((1, 1), (0, 2))
+
+
+@pytest.mark.parametrize("started", [False, True])
+def test_close_fails_prompts_still_queued(started):
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            batcher = PromptBatcher(
+                session=session,
+                semaphore=ModelSlots(1),
+                url="http://127.0.0.1:9/v1/completions",
+                body={},
+                max_wait=10,
+                multi_prompt=True,
+            )
+            # Unstarted, prompts sit in the queue; started, in the worker's batch
+            if started:
+                batcher.start()
+            pending = [asyncio.create_task(batcher.submit(p, 16)) for p in ("a", "b")]
+            await asyncio.sleep(0.01)
+            await batcher.close()
+            return await asyncio.wait_for(
+                asyncio.gather(*pending, return_exceptions=True), timeout=1,
+            )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
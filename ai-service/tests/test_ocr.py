@@ -0,0 +1,418 @@
+"""
+OCRService tests against a stub OpenAI chat completions server.
+"""
+
+import asyncio
+import base64
+from typing import Any, Callable, Dict, List
+
+import orjson
+import pytest
+from aiohttp import web
+
+from api import ocr as ocr_module
+from api.ocr import OCRRequest, OCRService
+
+
+def _image(name: str) -> str:
+    """Base64 image payload that identifies itself by name."""
+    return base64.b64encode(name.encode().ljust(12, b".")).decode()
+
+
+def _images_in(payload: Dict[str, Any]) -> List[str]:
+    """Base64 payloads of the images in a chat completion request."""
+    content = payload["messages"][0]["content"]
+    if isinstance(content, str):
+        return []
+    return [
+        part["image_url"]["url"].split(",", 1)[1]
+        for part in content if part["type"] == "image_url"
+    ]
+
+
+def _name_of(image: str) -> str:
+    return base64.b64decode(image).decode().rstrip(".")
+
+
+def _fused(text: str, prescription: Any = None) -> str:
+    return orjson.dumps({"text": text, "prescription": prescription}).decode()
+
+
+class VisionStub:
+    """
+    Answers chat completions with reply(payload), which returns the message
+    content; tracks every payload and the peak number of concurrent calls.
+    """
+
+    def __init__(self, reply: Callable[[Dict[str, Any]], str], delay: float = 0.0):
+        self.reply = reply
+        self.delay = delay
+        self.payloads: List[Dict[str, Any]] = []
+        self.active = 0
+        self.peak = 0
+        self.routes: List[web.RouteDef] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self.payloads.append(payload)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            content = self.reply(payload)
+        finally:
+            self.active -= 1
+        return web.json_response({"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture
+def run_ocr(monkeypatch):
+    """Run fn(service, base_url) against a VisionStub on a local server."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    def run(stub: VisionStub, fn, **service_attrs):
+        async def main():
+            app = web.Application()
+            app.router.add_post("/v1/chat/completions", stub.handle)
+            app.router.add_routes(stub.routes)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+            monkeypatch.setattr(
+                ocr_module, "OPENAI_CHAT_COMPLETIONS_URL", f"{base_url}/v1/chat/completions"
+            )
+
+            service = OCRService()
+            for name, value in service_attrs.items():
+                setattr(service, name, value)
+            try:
+                return await fn(service, base_url)
+            finally:
+                await service.aclose()
+                await runner.cleanup()
+
+        return asyncio.run(main())
+
+    return run
+
+
+# ----------------------------------------------------------------------------
+# Multi-image Vision batches
+# ----------------------------------------------------------------------------
+
+def _batch_reply(payload: Dict[str, Any]) -> str:
+    """Fused results for every image, in reverse order with explicit indexes."""
+    images = _images_in(payload)
+    if len(images) == 1:
+        return _fused(_name_of(images[0]), {"pd": 63})
+    items = [
+        {"index": i, "text": _name_of(image), "prescription": {"pd": 60 + i}}
+        for i, image in enumerate(images)
+    ]
+    return orjson.dumps(items[::-1]).decode()
+
+
+def test_batch_sends_images_together_and_maps_results_by_index(run_ocr):
+    stub = VisionStub(_batch_reply)
+    names = ["a", "b", "c"]
+
+    async def fn(service, _):
+        return await service.process_requests([
+            OCRRequest(image_base64=_image(name), validate_data=False) for name in names
+        ])
+
+    responses = run_ocr(stub, fn, vision_batch_size=4)
+
+    assert len(stub.payloads) == 1
+    assert [_name_of(image) for image in _images_in(stub.payloads[0])] == names
+    assert [response.extracted_text for response in responses] == names
+    assert [response.prescription_data.pd for response in responses] == [60, 61, 62]
+
+
+def test_batch_splits_into_chunks_of_vision_batch_size(run_ocr):
+    stub = VisionStub(_batch_reply)
+    names = ["a", "b", "c", "d", "e"]
+
+    async def fn(service, _):
+        return await service.process_requests([
+            OCRRequest(image_base64=_image(name), validate_data=False) for name in names
+        ])
+
+    responses = run_ocr(stub, fn, vision_batch_size=2)
+
+    assert sorted(len(_images_in(payload)) for payload in stub.payloads) == [1, 2, 2]
+    assert [response.extracted_text for response in responses] == names
+
+
+def test_batch_falls_back_to_one_call_per_image_on_mismatched_reply(run_ocr):
+    def reply(payload):
+        images = _images_in(payload)
+        if len(images) > 1:
+            # One result short, so it can't be matched up
+            return orjson.dumps([{"text": "?"}] * (len(images) - 1)).decode()
+        return _fused(_name_of(images[0]), {"pd": 63})
+
+    stub = VisionStub(reply)
+    names = ["a", "b", "c"]
+
+    async def fn(service, _):
+        return await service.process_requests([
+            OCRRequest(image_base64=_image(name), validate_data=False) for name in names
+        ])
+
+    responses = run_ocr(stub, fn, vision_batch_size=4)
+
+    assert [len(_images_in(payload)) for payload in stub.payloads] == [3, 1, 1, 1]
+    assert [response.extracted_text for response in responses] == names
+    assert all(response.success for response in responses)
+
+
+def test_batch_fallback_holds_one_slot_per_vision_call(run_ocr):
+    def reply(payload):
+        images = _images_in(payload)
+        if len(images) > 1:
+            return "not json"
+        return _fused(_name_of(images[0]))
+
+    stub = VisionStub(reply, delay=0.05)
+
+    async def fn(service, _):
+        return await service.process_requests([
+            OCRRequest(image_base64=_image(str(i)), validate_data=False) for i in range(4)
+        ])
+
+    responses = run_ocr(stub, fn, vision_batch_size=4, batch_concurrency=2)
+
+    assert all(response.success for response in responses)
+    assert len(stub.payloads) == 5
+    assert stub.peak == 2
+
+
+def test_batch_build_failure_only_fails_that_image(run_ocr):
+    def reply(payload):
+        images = _images_in(payload)
+        # A non-numeric sphere makes validation raise TypeError for "b"
+        return orjson.dumps([
+            {
+                "index": i,
+                "text": _name_of(image),
+                "prescription": {"rightEye": {"sphere": "x" if _name_of(image) == "b" else -1.0}},
+            }
+            for i, image in enumerate(images)
+        ]).decode()
+
+    stub = VisionStub(reply)
+
+    async def fn(service, _):
+        return await service.process_requests([
+            OCRRequest(image_base64=_image(name)) for name in ("a", "b", "c")
+        ])
+
+    responses = run_ocr(stub, fn, vision_batch_size=4)
+
+    assert [response.success for response in responses] == [True, False, True]
+    assert responses[1].errors
+
+
+# ----------------------------------------------------------------------------
+# Fused text extraction and parsing
+# ----------------------------------------------------------------------------
+
+def test_fused_reply_extracts_and_parses_in_one_call(run_ocr):
+    stub = VisionStub(lambda payload: "```json\n" + _fused("Rx text", {"pd": 64}) + "\n```")
+
+    async def fn(service, _):
+        return await service.process_prescription_image(
+            OCRRequest(image_base64=_image("a"), validate_data=False)
+        )
+
+    response = run_ocr(stub, fn)
+
+    assert len(stub.payloads) == 1
+    assert response.extracted_text == "Rx text"
+    assert response.prescription_data.pd == 64
+
+
+def test_non_json_fused_reply_is_parsed_with_a_second_call(run_ocr):
+    def reply(payload):
+        if _images_in(payload):
+            return "OD -1.00 OS -1.25 PD 62"
+        # Text-only parse request
+        return orjson.dumps({"pd": 62}).decode()
+
+    stub = VisionStub(reply)
+
+    async def fn(service, _):
+        return await service.process_prescription_image(
+            OCRRequest(image_base64=_image("a"), validate_data=False)
+        )
+
+    response = run_ocr(stub, fn)
+
+    assert len(stub.payloads) == 2
+    assert "OD -1.00 OS -1.25 PD 62" in stub.payloads[1]["messages"][0]["content"]
+    assert response.extracted_text == "OD -1.00 OS -1.25 PD 62"
+    assert response.prescription_data.pd == 62
+
+
+def test_text_only_request_skips_parsing(run_ocr):
+    stub = VisionStub(lambda payload: "plain text")
+
+    async def fn(service, _):
+        return await service.process_prescription_image(
+            OCRRequest(image_base64=_image("a"), parse_prescription=False)
+        )
+
+    response = run_ocr(stub, fn)
+
+    assert len(stub.payloads) == 1
+    assert response.extracted_text == "plain text"
+    assert response.prescription_data is None
+
+
+# ----------------------------------------------------------------------------
+# Result cache
+# ----------------------------------------------------------------------------
+
+def test_identical_image_and_flags_reuse_the_cached_result(run_ocr):
+    stub = VisionStub(lambda payload: _fused("Rx text", {"pd": 64}))
+
+    async def fn(service, _):
+        first = await service.process_prescription_image(OCRRequest(image_base64=_image("a")))
+        # Same bytes, with the data URL prefix this time
+        second = await service.process_prescription_image(
+            OCRRequest(image_base64="data:image/jpeg;base64," + _image("a"))
+        )
+        return first, second
+
+    first, second = run_ocr(stub, fn)
+
+    assert len(stub.payloads) == 1
+    assert second.prescription_data == first.prescription_data
+    assert second is not first
+
+
+def test_cache_key_includes_image_and_flags(run_ocr):
+    stub = VisionStub(lambda payload: _fused("Rx text", {"pd": 64}))
+
+    async def fn(service, _):
+        await service.process_prescription_image(OCRRequest(image_base64=_image("a")))
+        await service.process_prescription_image(OCRRequest(image_base64=_image("b")))
+        await service.process_prescription_image(
+            OCRRequest(image_base64=_image("a"), validate_data=False)
+        )
+
+    run_ocr(stub, fn)
+
+    assert len(stub.payloads) == 3
+
+
+def test_failed_parse_is_not_cached(run_ocr):
+    # Neither the fused reply nor the parse call yields prescription JSON
+    stub = VisionStub(lambda payload: "unreadable")
+
+    async def fn(service, _):
+        first = await service.process_prescription_image(OCRRequest(image_base64=_image("a")))
+        second = await service.process_prescription_image(OCRRequest(image_base64=_image("a")))
+        return first, second
+
+    first, second = run_ocr(stub, fn)
+
+    assert first.prescription_data is None and second.prescription_data is None
+    # Vision and parse calls for each request
+    assert len(stub.payloads) == 4
+
+
+# ----------------------------------------------------------------------------
+# URL downloads
+# ----------------------------------------------------------------------------
+
+def _jpeg(size=(32, 32)) -> bytes:
+    from PIL import Image
+    import io
+
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _download_stub() -> VisionStub:
+    stub = VisionStub(lambda payload: _fused("Rx text"))
+    limit = ocr_module.MAX_IMAGE_BYTES
+
+    async def announced(request):
+        return web.Response(body=b"\0" * (limit + 1), content_type="image/jpeg")
+
+    async def chunked(request):
+        response = web.StreamResponse()
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for _ in range(4):
+            await response.write(b"\0" * (limit // 3))
+        await response.write_eof()
+        return response
+
+    async def jpeg(request):
+        return web.Response(body=_jpeg(), content_type="image/jpeg")
+
+    stub.routes = [
+        web.get("/announced", announced),
+        web.get("/chunked", chunked),
+        web.get("/ok.jpg", jpeg),
+    ]
+    return stub
+
+
+@pytest.mark.parametrize("path", ["/announced", "/chunked"])
+def test_download_over_size_limit_is_rejected(run_ocr, monkeypatch, caplog, path):
+    monkeypatch.setattr(ocr_module, "MAX_IMAGE_BYTES", 64 * 1024)
+    stub = _download_stub()
+
+    async def fn(service, base_url):
+        return await service.process_prescription_image(
+            OCRRequest(image_url=base_url + path)
+        )
+
+    response = run_ocr(stub, fn)
+
+    assert not response.success
+    assert "Image exceeds size limit" in caplog.text
+    assert stub.payloads == []
+
+
+def test_download_within_limit_passes_jpeg_through(run_ocr, monkeypatch):
+    monkeypatch.setattr(ocr_module, "MAX_IMAGE_BYTES", 64 * 1024)
+    stub = _download_stub()
+
+    async def fn(service, base_url):
+        return await service.process_prescription_image(
+            OCRRequest(image_url=base_url + "/ok.jpg", parse_prescription=False)
+        )
+
+    response = run_ocr(stub, fn)
+
+    assert response.success
+    assert _images_in(stub.payloads[0]) == [base64.b64encode(_jpeg()).decode()]
+
+
+# ----------------------------------------------------------------------------
+# Base64 payloads
+# ----------------------------------------------------------------------------
+
+@pytest.mark.parametrize("payload, error", [
+    ("not base64!!", "Invalid base64 image data"),
+    ("abc", "Invalid base64 image data"),
+    ("A" * (ocr_module._MAX_IMAGE_BASE64_CHARS + 4), "Image exceeds size limit"),
+])
+def test_bad_base64_is_rejected_without_calling_vision(run_ocr, payload, error):
+    stub = VisionStub(lambda payload: _fused("Rx text"))
+
+    async def fn(service, _):
+        return await service.process_prescription_image(OCRRequest(image_base64=payload))
+
+    response = run_ocr(stub, fn)
+
+    assert response.errors == [error]
+    assert stub.payloads == []
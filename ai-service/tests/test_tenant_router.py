@@ -0,0 +1,227 @@
+"""
+TenantRouter tests: in-flight coalescing, LRU eviction and cache sweeping.
+"""
+
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+from api import tenant_router as tenant_router_module
+from api.tenant_router import TenantRouter
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1000.0)
+    monkeypatch.setattr(tenant_router_module.time, "monotonic", clock)
+    return clock
+
+
+def test_concurrent_identical_queries_share_one_call():
+    router = TenantRouter()
+    calls = 0
+
+    async def process_query(tenant_id, query, query_type, config):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"answer": "42", "tokens_used": 3, "success": True}
+
+    router._process_query = process_query
+
+    async def run():
+        return await asyncio.gather(*(
+            router.route_query("t1", "Top sellers?", "sales", "u1")
+            for _ in range(5)
+        ))
+
+    responses = asyncio.run(run())
+
+    assert calls == 1
+    assert all(response["answer"] == "42" for response in responses)
+    assert sorted(response["from_cache"] for response in responses) == [False] + [True] * 4
+    assert router.get_usage_stats("t1") == {
+        "requests_count": 1, "tokens_used": 3, "cache_hits": 4, "errors": 0,
+    }
+    assert router._inflight == {}
+
+
+def test_request_cache_evicts_least_recently_used(clock):
+    router = TenantRouter()
+    router.max_cache_entries = 2
+
+    router.cache_response("t1", "a", "sales", {"answer": "a"})
+    router.cache_response("t1", "b", "sales", {"answer": "b"})
+    # Reading "a" makes "b" the least recently used
+    assert router.check_duplicate_request("t1", "a", "sales") == {"answer": "a"}
+    router.cache_response("t1", "c", "sales", {"answer": "c"})
+
+    assert router.check_duplicate_request("t1", "b", "sales") is None
+    assert router.check_duplicate_request("t1", "a", "sales") == {"answer": "a"}
+    assert router.check_duplicate_request("t1", "c", "sales") == {"answer": "c"}
+
+
+@pytest.fixture
+def fake_engines(monkeypatch):
+    """Replace SecureRAGEngine with a stub; returns the engines built, in order."""
+    built = []
+
+    class FakeEngine:
+        def __init__(self, tenant_config, model_path):
+            self.tenant_id = tenant_config.tenant_id
+            self.closed = False
+            built.append(self)
+
+        def query_sales(self, question):
+            # Give other tenants a chance to evict this engine mid-query
+            time.sleep(0.05)
+            return {"answer": "closed" if self.closed else "open", "success": True}
+
+        def close(self):
+            self.closed = True
+
+    class FakeConfig:
+        def __init__(self, tenant_id, **connections):
+            self.tenant_id = tenant_id
+
+    fake_module = types.ModuleType("rag.secure_rag_engine")
+    fake_module.SecureRAGEngine = FakeEngine
+    fake_module.TenantDatabaseConfig = FakeConfig
+    monkeypatch.setitem(sys.modules, "rag.secure_rag_engine", fake_module)
+    return built
+
+
+def test_engines_evict_and_close_least_recently_used(fake_engines):
+    router = TenantRouter()
+    router.max_engines = 2
+
+    async def run():
+        for tenant_id in ("a", "b", "a", "c"):
+            await router._get_engine(tenant_id, router.get_tenant_config(tenant_id))
+        await asyncio.gather(*router._closing_engines)
+        return list(router._engines)
+
+    assert asyncio.run(run()) == ["a", "c"]
+    assert [engine.tenant_id for engine in fake_engines if engine.closed] == ["b"]
+
+
+def test_evicted_engine_isnt_closed_during_its_query(fake_engines):
+    router = TenantRouter()
+    router.max_engines = 1
+
+    async def run():
+        config = router.get_tenant_config("a")
+        query_a = asyncio.create_task(router._run_engine_query("a", config, "query_sales", "q"))
+        # Let "a" get its engine and start querying, then evict it
+        await asyncio.sleep(0.01)
+        await router._get_engine("b", router.get_tenant_config("b"))
+        result = await query_a
+        await router.close()
+        return result
+
+    assert asyncio.run(run())["answer"] == "open"
+    assert all(engine.closed for engine in fake_engines)
+
+
+def test_router_can_be_restarted_after_close(fake_engines):
+    router = TenantRouter()
+
+    async def lifespan():
+        router.start()
+        result = await router.route_query("a", "Top sellers?", "sales", "u1")
+        await router.close()
+        return result
+
+    # Each asyncio.run is a new event loop, like a second TestClient(app)
+    for _ in range(2):
+        router.request_cache.clear()
+        assert asyncio.run(lifespan())["success"] is True
+    assert router.get_usage_stats("a")["requests_count"] == 2
+
+
+def test_sweep_drops_only_expired_buckets(clock):
+    router = TenantRouter()
+    router.cache_ttl = 300
+    router.cache_sweep_interval = 10
+
+    clock.now = 1000.0
+    router.cache_response("t1", "old", "sales", {"answer": "old"})
+    router.cache_response("t1", "recached", "sales", {"answer": "recached"})
+    clock.now = 1250.0
+    router.cache_response("t1", "recached", "sales", {"answer": "recached"})
+    router.cache_response("t1", "new", "sales", {"answer": "new"})
+
+    # The 1000s bucket expires once its whole width is past the TTL
+    clock.now = 1309.0
+    router._sweep_expired()
+    assert len(router.request_cache) == 3
+
+    clock.now = 1310.0
+    router._sweep_expired()
+    remaining = {entry["response"]["answer"] for entry in router.request_cache.values()}
+    assert remaining == {"recached", "new"}
+    assert list(router._ttl_buckets) == [125]
+
+
+def test_cache_response_prunes_expired_buckets_without_sweeper(clock):
+    router = TenantRouter()
+    router.cache_ttl = 300
+    router.cache_sweep_interval = 10
+
+    for i in range(50):
+        clock.now = 1000.0 + i * 100
+        router.cache_response("t1", f"q{i}", "sales", {"answer": i})
+
+    # Only buckets that can still hold live entries are kept
+    assert router._cache_sweeper is None
+    assert len(router._ttl_buckets) <= 4
+    assert len(router.request_cache) <= 4
+
+
+def test_rate_limit_allows_a_burst_then_refills_continuously(clock):
+    router = TenantRouter()
+
+    assert all(router.check_rate_limit("t1", 60) for _ in range(60))
+    assert not router.check_rate_limit("t1", 60)
+
+    # One request per second refills at 60/min
+    clock.now += 1.0
+    assert router.check_rate_limit("t1", 60)
+    assert not router.check_rate_limit("t1", 60)
+
+    # Other tenants have their own bucket
+    assert router.check_rate_limit("t2", 60)
+
+
+def test_rate_limit_bucket_never_holds_more_than_a_minute(clock):
+    router = TenantRouter()
+    router.check_rate_limit("t1", 10)
+
+    clock.now += 3600
+    assert sum(router.check_rate_limit("t1", 10) for _ in range(20)) == 10
+
+
+def test_denied_requests_dont_spend_tokens(clock):
+    router = TenantRouter()
+    for _ in range(10):
+        router.check_rate_limit("t1", 10)
+
+    # Hammering while empty mustn't delay the next refill
+    for _ in range(5):
+        clock.now += 0.1
+        assert not router.check_rate_limit("t1", 10)
+    clock.now += 5.6
+    assert router.check_rate_limit("t1", 10)
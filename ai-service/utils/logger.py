@@ -13,6 +13,9 @@ log_json = os.getenv("LOG_JSON", "true").lower() == "true"
 # Remove default handler
 logger.remove()
 
+# Sinks are added with enqueue=True so records are written to stdout by
+# loguru's worker thread rather than by the logging call itself
+
 # Add custom handler with appropriate format
 if log_json:
     # JSON format for production
@@ -21,6 +24,7 @@ if log_json:
         format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}",
         level=log_level,
         serialize=True,
+        enqueue=True,
     )
 else:
     # Human-readable format for development
@@ -29,6 +33,7 @@ else:
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | <level>{message}</level>",
         level=log_level,
         colorize=True,
+        enqueue=True,
     )
 
 # Export logger